@@ -0,0 +1,146 @@
+#!/usr/bin/python
+#============================== components01 ==============================
+#
+# @brief    Check the connected components backends against scikit-image.
+#
+# Each backend labels random blob masks, for both connectivities, and its
+# regions must be those of skimage.measure.label with regionprops: same
+# label image, areas, centroids and bounding boxes.  The same goes for the
+# strip labeler, on masks with blobs that cross the strip seams, and for
+# the out-of-core band labeler, on the same masks read from a memory map
+# (bands give areas and centroids only).  Exits with an error status if a
+# check fails.
+#
+#============================== components01 ==============================
+#
+# @date     2026/10/17              [created]
+#
+#============================== components01 ==============================
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+from skimage.measure import label, regionprops
+
+from trackpointer import components
+
+#=============================== reference ===============================
+#
+# @brief  Label image and regions from skimage label and regionprops.
+#
+def reference(Ib, conn):
+
+  Il   = label(Ib, connectivity=conn)
+  regs = regionprops(Il)
+
+  area = np.array([reg.area for reg in regs], dtype=np.int64)
+  cpt  = np.array([reg.centroid[::-1] for reg in regs]).reshape(-1,2).T
+  bbox = np.array([reg.bbox for reg in regs], dtype=np.int64).reshape(-1,4)
+
+  return Il, area, cpt, bbox
+
+#=============================== isSame ================================
+#
+# @brief  Whether labeling results are those of the reference.
+#
+def isSame(Il, nl, area, cpt, ref):
+
+  Ir, ar, cr, br = ref
+  if nl != len(ar) or not np.array_equal(Il, Ir) or not np.array_equal(area, ar):
+    return False
+
+  bbox = components.regionTable(Il, nl, columns=('bbox',))['bbox']
+
+  return np.allclose(cpt, cr) and np.array_equal(bbox, br)
+
+#================================ masks ================================
+#
+# @brief  Random blob masks, of sizes that are not multiples of anything.
+#
+def masks():
+
+  rng = np.random.default_rng(0)
+  for ii in range(20):
+    H, W = rng.integers(20, 300, 2)
+    yield rng.random((H, W)) < rng.uniform(0.05, 0.6)
+
+  yield components.randomBlobs((257, 333), 40, 12, 1)
+  yield np.zeros((40, 50), dtype=bool)
+  yield np.ones((40, 50), dtype=bool)
+
+#============================== seamMask ===============================
+#
+# @brief  Mask with blobs across the seams of 4 strips (rows 64, 128, 192).
+#
+# A bar through all seams, an arch whose two legs only join in the strip
+# above, a U whose legs only join in the strip below, and two pixels
+# touching diagonally across a seam (one blob if 8-connected, two if
+# 4-connected).
+#
+def seamMask():
+
+  Ib = np.zeros((256, 100), dtype=bool)
+  Ib[40:210, 5:8]   = True                  # Bar.
+  Ib[50:53, 20:33]  = True                  # Arch top.
+  Ib[50:100, 20:23] = True                  # Arch legs.
+  Ib[50:100, 30:33] = True
+  Ib[110:170, 40:43] = True                 # U legs.
+  Ib[110:170, 46:49] = True
+  Ib[167:170, 40:49] = True                 # U bottom.
+  Ib[127, 50] = Ib[128, 51] = True          # Diagonal touch.
+  Ib[180:200, 60:90] = True                 # Blob within a strip.
+
+  return Ib
+
+isOk = True
+
+#==[1] Backends, by name.
+#
+for backend in components.BACKENDS:
+  isPass = all(isSame(*components.labelRegions(Ib, conn, backend), reference(Ib, conn))
+               for Ib in masks() for conn in (1, 2))
+  isOk = isOk and isPass
+  print('%-24s %s' % ('backend ' + backend, 'ok' if isPass else 'FAILED'))
+
+#==[2] Strip labeler, over each serial backend.
+#
+for backend in ('skimage', 'cv2', 'scipy'):
+  isPass = True
+  for Ib in [seamMask()] + list(masks()):
+    for conn in (1, 2):
+      for nStrip in (2, 3, 4):
+        res    = components.labelStrips(Ib, conn, True, backend, nStrip)
+        isPass = isPass and isSame(*res, reference(Ib, conn))
+  isOk = isOk and isPass
+  print('%-24s %s' % ('strips ' + backend, 'ok' if isPass else 'FAILED'))
+
+#==[3] Band labeler, streaming from a memory map, over each backend.
+#
+fname = os.path.join(tempfile.mkdtemp(), 'mask.npy')
+for backend in ('skimage', 'cv2', 'scipy'):
+  isPass = True
+  for Ib in [seamMask()] + list(masks()):
+    np.save(fname, Ib)
+    Im = np.load(fname, mmap_mode='r')
+    for conn in (1, 2):
+      _, ar, cr, _ = reference(Ib, conn)
+      for band in (16, 64, 100):
+        area, cpt, key = zip(*components.bandRegions(Im, band, conn, backend))
+        order  = np.argsort(np.concatenate(key))
+        area   = np.concatenate(area)[order]
+        cpt    = np.concatenate(cpt, axis=1)[:,order]
+        isPass = isPass and np.array_equal(area, ar) and np.allclose(cpt, cr)
+    del Im
+  isOk = isOk and isPass
+  print('%-24s %s' % ('bands ' + backend, 'ok' if isPass else 'FAILED'))
+
+os.remove(fname)
+os.rmdir(os.path.dirname(fname))
+
+if not isOk:
+  sys.exit(1)
+
+#
+#============================== components01 ==============================
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+#=============================== importTime01 ==============================
+#
+# @brief    Check the import time of the trackpointer modules.
+#
+# Each module is imported in a fresh interpreter.  Its import time beyond
+# that of the required dependencies (numpy, detector.Configuration) must be
+# within the budget, and plotting, OpenCV, scikit-image and scipy should
+# not be loaded by the import (they load on first use).  Exits with an
+# error status if a check fails.
+#
+#=============================== importTime01 ==============================
+#
+# @date     2026/10/17              [created]
+#
+#=============================== importTime01 ==============================
+
+import subprocess
+import sys
+
+budget  = 0.050                         # Seconds, beyond the baseline.
+repeats = 5                             # Best of, to reduce noise.
+
+modules = ['trackpointer.centroid', 'trackpointer.toplines',
+           'trackpointer.centroidMulti', 'trackpointer.pipeline',
+           'trackpointer.history', 'trackpointer.masks',
+           'trackpointer.filterbank', 'trackpointer.association',
+           'trackpointer.components', 'trackpointer.timing',
+           'trackpointer.utils.displaySink']
+lazy    = ['matplotlib', 'cv2', 'skimage', 'scipy', 'asyncio']
+
+probe = '''
+import sys, time
+t0 = time.perf_counter()
+import numpy, detector.Configuration
+t1 = time.perf_counter()
+if "%s":
+  import %s
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1, *[m for m in %r if m in sys.modules])
+'''
+
+def timeImport(module):
+
+  best = None
+  for ii in range(repeats):
+    out = subprocess.run([sys.executable, '-c', probe % (module, module or 'sys', lazy)],
+                         capture_output=True, text=True, check=True).stdout.split()
+    tImport = float(out[1])
+    if best is None or tImport < best[0]:
+      best = (tImport, out[2:])
+
+  return best
+
+isOk = True
+for module in modules:
+  tImport, loaded = timeImport(module)
+  status = 'ok'
+  if tImport > budget:
+    status = 'OVER BUDGET'
+  if loaded:
+    status = 'LOADED ' + ','.join(loaded)
+  isOk = isOk and (status == 'ok')
+
+  print('%-32s %7.1f ms   %s' % (module, 1e3*tImport, status))
+
+if not isOk:
+  sys.exit(1)
+
+#
+#=============================== importTime01 ==============================
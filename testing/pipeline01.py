@@ -0,0 +1,65 @@
+#!/usr/bin/python
+#================================ pipeline01 ===============================
+#
+# @brief    Check the pipelined tracker: frame order of the results, and
+#           stopping a pipeline whose results were never retrieved.
+#
+# Runs a centroid tracker on a blob that moves one pixel per frame.  The
+# second check saturates the pipeline (every queue full, both stage threads
+# blocked on their outputs) and then stops it, which must not hang.  Exits
+# with an error status if a check fails.
+#
+#================================ pipeline01 ===============================
+#
+# @date     2026/10/17              [created]
+#
+#================================ pipeline01 ===============================
+
+import sys
+import threading
+
+import numpy as np
+
+import trackpointer.centroid as tc
+from trackpointer.pipeline import pipelined
+
+depth = 2
+
+def frame(k):
+  I = np.zeros((60,80), dtype=bool)
+  I[20:26, 10+k:16+k] = True
+  return I
+
+isOk = True
+
+#==[1] Results come back in frame order.
+#
+tpipe = pipelined(tc.centroid(), depth=depth)
+xs    = [tstate.tpt[0,0] for tstate in tpipe.map(frame(k) for k in range(20))]
+tpipe.stop()
+
+isOrdered = np.allclose(xs, 12.5 + np.arange(20))
+isOk = isOk and isOrdered
+print('frame order          ', 'ok' if isOrdered else 'FAILED')
+
+#==[2] Stop a saturated pipeline, with no result retrieved.
+#
+# Each stage queue holds 'depth' frames and each stage thread one more.
+#
+tpipe = pipelined(tc.centroid(), depth=depth)
+for k in range(3*depth + 2):
+  tpipe.put(frame(k), timeout=5)
+
+stopper = threading.Thread(target=tpipe.stop, daemon=True)
+stopper.start()
+stopper.join(5)
+
+isStopped = not stopper.is_alive() and not any(th.is_alive() for th in tpipe.threads)
+isOk = isOk and isStopped
+print('stop when saturated  ', 'ok' if isStopped else 'FAILED (hung)')
+
+if not isOk:
+  sys.exit(1)
+
+#
+#================================ pipeline01 ===============================
@@ -0,0 +1,175 @@
+#=============================== association =============================
+#
+# @brief    Frame to frame association of track points, with identities.
+#
+# Multi-target track pointers (centroidMulti) measure an unordered set of
+# points per frame.  An associator matches them to the tracks of the
+# previous frames, so that each point carries a persistent track ID.
+# Candidate pairs within a gating distance come from a KD-tree, and the
+# assignment minimizing the total distance is solved as a sparse minimum
+# weight bipartite matching, so many targets do not need an O(N^2) loop.
+# Unmatched points start new tracks, and tracks unmatched for too long
+# are ended.  With a filter bank, tracks are matched at their predicted
+# positions, and the filter estimates are kept aligned with the tracks.
+#
+#=============================== association =============================
+
+#
+# @file     association.py
+#
+# @date     2026/10/17  [created]
+#
+#!NOTE:
+#!  set indent to 2 spaces.
+#!  do not indent function code.
+#!  set tab to 4 spaces with conversion to spaces.
+#
+#=============================== association =============================
+
+import numpy as np
+
+
+#
+#---------------------------------------------------------------------------
+#=============================== associator ================================
+#---------------------------------------------------------------------------
+#
+
+class associator(object):
+  '''!
+  @brief  Nearest neighbor track association with births and deaths.
+
+  The tracks are the track IDs (``ids``), their last positions (``pos``,
+  2 x M) and their counts of consecutive missed frames (``miss``).  A
+  point matches a track only within the gating distance.  A track missing
+  more than ``maxMiss`` consecutive frames is ended, and its ID is not
+  reused.  Without a filter, the track positions are the last matched
+  points.  With a filter bank (e.g., trackpointer.filterbank.cvBank), they
+  are the filter predictions, with the filter states in the track order.
+  '''
+
+  #============================ associator ===========================
+  #
+  # @brief  Constructor.
+  #
+  # @param[in]  gate      Gating distance (pixels).
+  # @param[in]  maxMiss   Frames a track may go unmatched before ending.
+  # @param[in]  filt      Filter bank of the track positions (optional).
+  #
+  def __init__(self, gate = 20.0, maxMiss = 0, filt = None):
+
+    self.gate    = gate
+    self.maxMiss = maxMiss
+    self.filt    = filt
+    self.reset()
+
+  #=============================== reset =============================
+  #
+  # @brief  Forget all tracks.  IDs restart from 0.
+  #
+  def reset(self):
+
+    self.ids    = np.zeros(0, dtype=np.int64)
+    self.pos    = np.zeros((2,0))
+    self.miss   = np.zeros(0, dtype=np.int64)
+    self.nextId = 0
+
+    if self.filt is not None:
+      self.filt.reset()
+
+  #=============================== match =============================
+  #
+  # @brief  Optimal gated assignment of the tracks to the points.
+  #
+  # Each track may also go unmatched, at a cost of the gating distance,
+  # so the matching is always feasible.  Costs are offset by one so that
+  # coincident points are not taken as missing (zero) sparse entries.
+  #
+  # @param[in]  pos       Track positions (2 x M).
+  # @param[in]  tpt       Points (2 x N).
+  #
+  # @param[out] mTrk      Matched track indices.
+  # @param[out] mPts      Matched point indices (same length).
+  #
+  def match(self, pos, tpt):
+
+    from scipy.spatial import cKDTree
+    from scipy.sparse import coo_matrix, csr_matrix
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+    nTrk, nPts = pos.shape[1], tpt.shape[1]
+    if nTrk == 0 or nPts == 0:
+      return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    dist = cKDTree(pos.T).sparse_distance_matrix(cKDTree(tpt.T), self.gate,
+                                                 output_type='coo_matrix')
+    isIn = dist.data < self.gate
+    if not np.any(isIn):
+      return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Points nPts + i are the "unmatched" options of the tracks i.
+    rows = np.concatenate((dist.row[isIn], np.arange(nTrk)))
+    cols = np.concatenate((dist.col[isIn], nPts + np.arange(nTrk)))
+    cost = np.concatenate((dist.data[isIn], np.full(nTrk, float(self.gate)))) + 1
+
+    graph = csr_matrix(coo_matrix((cost, (rows, cols)), shape=(nTrk, nPts + nTrk)))
+    mCol  = min_weight_full_bipartite_matching(graph)[1]
+
+    mTrk = np.flatnonzero(mCol < nPts)
+    return mTrk, mCol[mTrk]
+
+  #============================== update =============================
+  #
+  # @brief  Associate the points of a new frame, and update the tracks.
+  #
+  # @param[in]  tpt       Points (2 x N), e.g., centroidMulti.tpt.
+  #
+  # @param[out] tid       Track IDs of the points (N).
+  #
+  def update(self, tpt):
+
+    tpt  = np.reshape(tpt, (2,-1))
+    nPts = tpt.shape[1]
+
+    if self.filt is not None:
+      self.filt.predict()
+      self.pos = self.filt.position()
+
+    mTrk, mPts = self.match(self.pos, tpt)
+
+    tid = np.full(nPts, -1, dtype=np.int64)
+    tid[mPts] = self.ids[mTrk]
+
+    # Matched tracks move to their points, the others coast (or end).
+    self.miss += 1
+    self.miss[mTrk] = 0
+    if self.filt is not None:
+      self.filt.correct(mTrk, tpt[:, mPts])
+    else:
+      self.pos[:, mTrk] = tpt[:, mPts]
+
+    isAlive   = self.miss <= self.maxMiss
+    self.ids  = self.ids[isAlive]
+    self.pos  = self.pos[:, isAlive]
+    self.miss = self.miss[isAlive]
+    if self.filt is not None:
+      self.filt.select(isAlive)
+
+    # Unmatched points are births.
+    isNew = tid < 0
+    nNew  = np.count_nonzero(isNew)
+    tid[isNew]  = self.nextId + np.arange(nNew)
+    self.nextId += nNew
+
+    self.ids  = np.concatenate((self.ids, tid[isNew]))
+    self.pos  = np.concatenate((self.pos, tpt[:, isNew]), axis=1)
+    self.miss = np.concatenate((self.miss, np.zeros(nNew, dtype=np.int64)))
+
+    if self.filt is not None:
+      self.filt.add(tpt[:, isNew])
+      self.pos = self.filt.position()
+
+    return tid
+
+#
+#=============================== association =============================
@@ -33,15 +33,71 @@
 #
 #================================ centroid ===============================
 
+import threading
+
 import numpy as np
-import matplotlib.pyplot as plt
-from dataclasses import dataclass
 from detector.Configuration import AlgConfig
 
-@dataclass
-class TrackState:
-  tpt: np.ndarray = np.array([])
-  haveMeas: bool = False
+from trackpointer.masks import CompactMask
+from trackpointer.timing import StageTimer
+
+class TrackState(object):
+  '''!
+  @brief  Track pointer state: the track point and the measurement flag.
+
+  When the tracker has timing enabled, the state also carries the frame
+  capture and processing completion times (else they are None).  Multi-
+  target trackers with association give the track IDs of the points.
+
+  Slots based to keep the per-frame state objects small.  A state can be
+  filled in place (see ``fill``), in which case the track point is copied
+  into the state's existing buffer.  Passing such a state to a tracker's
+  ``process`` or ``measure`` then runs the per-frame path without
+  creating new state objects or point arrays.
+  '''
+  __slots__ = ('tpt', 'haveMeas', 'tCapture', 'tDone', 'tid')
+
+  #============================ TrackState ===========================
+  #
+  # @param[in]  tpt       The track point(s), or None.
+  # @param[in]  haveMeas  Flag indicating whether there is a measurement.
+  # @param[in]  tCapture  Frame capture time (optional).
+  # @param[in]  tDone     Processing completion time (optional).
+  # @param[in]  tid       Track IDs of the track points (optional).
+  #
+  def __init__(self, tpt = None, haveMeas = False, tCapture = None, tDone = None,
+                     tid = None):
+
+    self.tpt      = tpt
+    self.haveMeas = haveMeas
+    self.tCapture = tCapture
+    self.tDone    = tDone
+    self.tid      = tid
+
+  #=============================== fill ==============================
+  #
+  # @brief  Set the state in place.
+  #
+  # The track point is copied into the existing buffer when the shapes
+  # agree, otherwise the buffer is replaced.  Without a measurement, the
+  # buffer is kept (with stale content) for the next fill.
+  #
+  def fill(self, tpt, haveMeas):
+
+    self.haveMeas = haveMeas
+
+    if haveMeas and (tpt is not self.tpt):
+      if isinstance(self.tpt, np.ndarray) and (self.tpt.shape == np.shape(tpt)):
+        self.tpt[...] = tpt
+      else:
+        self.tpt = tpt
+
+  #============================== __repr__ ===========================
+  #
+  def __repr__(self):
+
+    return 'TrackState(' + ', '.join(name + '=' + repr(getattr(self, name))
+                                     for name in TrackState.__slots__) + ')'
 
 class CfgCentroid(AlgConfig):
   """The parameters for the centroid tracker
@@ -49,8 +105,53 @@ class CfgCentroid(AlgConfig):
   Args:
     plotStyle (str): The plot style from the matplotlib for the centroid. Defaults to "rx". \
       Detailed choices see: https://matplotlib.org/stable/api/_as_gen/matplotlib.pyplot.plot.html
+    engine (str): How the centroid is computed. Defaults to "moments", which gets the \
+      image moments from row and column projection sums (O(H+W) memory). The option \
+      "nonzero" averages the ``np.nonzero`` pixel coordinates.
+    gated (bool): Measure only within a window about a constant velocity prediction of \
+      the track point. Falls back to a full image search when the target is lost. \
+      Defaults to False.
+    gateMin (float): Minimum half-size (pixels) of the gating window. Defaults to 24.
+    gateGain (float): Gating window growth per pixel/frame of recent motion. Defaults to 2.
+    pyrFactor (int): Coarse-to-fine search when > 1. The blob is found on the mask \
+      subsampled by this factor (4 or 8 typical), then the centroid is computed at full \
+      resolution within the blob bounding box only. Blobs smaller than the factor \
+      can fall between the samples: if no blob is sampled, the full resolution mask \
+      is used, otherwise such small blobs away from the sampled ones are left out. \
+      Defaults to 0 (off).
+    incremental (bool): Keep running moment sums and update them from the pixels that \
+      changed since the previous frame. Takes precedence over gating and pyramid. \
+      Defaults to False.
+    incRefresh (int): Incremental updates between full recomputes. Defaults to 100.
+    incMaxDelta (float): Fraction of changed pixels above which a full pass is done \
+      instead of an incremental update. Defaults to 0.05.
   """
-  plotStyle:str = "rx"
+  #============================= __init__ ============================
+  #
+  def __init__(self, init_dict=None, key_list=None, new_allowed=True):
+
+    if (init_dict == None):
+      init_dict = CfgCentroid.get_default_settings()
+
+    super().__init__(init_dict, key_list, new_allowed)
+
+  #========================= get_default_settings ========================
+  #
+  # @brief    Recover the default settings in a dictionary.
+  #
+  @staticmethod
+  def get_default_settings():
+    '''!
+    @brief  Defines most basic, default settings for centroid tracking.
+
+    @param[out] default_dict  Dictionary populated with minimal set of
+                              default settings.
+    '''
+    default_dict = dict(plotStyle = 'rx', engine = 'moments', \
+                        gated = False, gateMin = 24.0, gateGain = 2.0, \
+                        pyrFactor = 0, \
+                        incremental = False, incRefresh = 100, incMaxDelta = 0.05)
+    return default_dict
 
 #
 #---------------------------------------------------------------------------
@@ -94,6 +195,129 @@ class CfgCentroind(AlgConfig):
     return default_dict
 
 
+class Preprocessed(object):
+  '''!
+  @brief  Image that has already been through the tracker's preprocessing.
+
+  Trackers pass the wrapped image straight to the measurement, skipping
+  the improcessor.  Used when preprocessing happens elsewhere, e.g., in a
+  separate stage of a ``trackpointer.pipeline.pipelined`` tracker.
+  '''
+  __slots__ = ('image',)
+
+  def __init__(self, image):
+    self.image = image
+
+#
+#---------------------------------------------------------------------------
+#============================== Mask Moments ===============================
+#---------------------------------------------------------------------------
+#
+
+#============================ maskProjections ============================
+#
+# @brief  Row and column counts of the nonzero pixels of a mask.
+#
+# Boolean masks are summed directly.  Other types are thresholded in row
+# bands, so that the temporary storage stays O(W) instead of O(HW).
+#
+# @param[in]  Ip        The (binary) mask image.
+# @param[in]  nBand     Number of rows thresholded at a time.
+#
+# @param[out] rowCount  Nonzero count of each row (H).
+# @param[out] colCount  Nonzero count of each column (W).
+#
+def maskProjections(Ip, nBand = 64):
+
+  if (Ip.dtype == bool):
+    rowCount = np.sum(Ip, axis=1, dtype=np.int64)
+    colCount = np.sum(Ip, axis=0, dtype=np.int64)
+  else:
+    rowCount = np.empty(Ip.shape[0], dtype=np.int64)
+    colCount = np.zeros(Ip.shape[1], dtype=np.int64)
+    for r0 in range(0, Ip.shape[0], nBand):
+      Ib = Ip[r0:r0+nBand] != 0
+      rowCount[r0:r0+nBand] = np.sum(Ib, axis=1)
+      colCount += np.sum(Ib, axis=0)
+
+  return rowCount, colCount
+
+#============================== maskMoments ==============================
+#
+# @brief  Zeroth and first order moments of the nonzero pixels of a mask.
+#
+# The first order moments are dot products of the projections with index
+# ramps.  All sums are integer valued, so the centroid is identical to the
+# mean of the ``np.nonzero`` coordinates.
+#
+# @param[in]  Ip    The (binary) mask image.
+#
+# @param[out] m00   Pixel count.
+# @param[out] m10   Sum of column (x) coordinates.
+# @param[out] m01   Sum of row (y) coordinates.
+#
+def maskMoments(Ip):
+
+  rowCount, colCount = maskProjections(Ip)
+
+  m00 = np.sum(rowCount)
+  m10 = np.dot(colCount.astype(np.float64), np.arange(colCount.size, dtype=np.float64))
+  m01 = np.dot(rowCount.astype(np.float64), np.arange(rowCount.size, dtype=np.float64))
+
+  return m00, m10, m01
+
+
+#============================= windowMoments =============================
+#
+# @brief  Moments of the foreground within an image window.
+#
+# The window is clipped to the image.  If the foreground touches an
+# interior side of the window (one that is not an image border), the
+# window doubles in size about its center and the moments are recomputed.
+# Hence a blob seen in the window is never truncated.
+#
+# @param[in]  Ip      The (binary) mask image.
+# @param[in]  win     Window (r0, r1, c0, c1), as half-open row and column
+#                     ranges.
+#
+# @param[out] mom     Moments (m00, m10, m01), or None if window is empty.
+# @param[out] win     The final window, or None if window is empty.
+# @param[out] nTouch  Total number of pixels examined.
+#
+def windowMoments(Ip, win):
+
+  imsize = np.shape(Ip)
+  nTouch = 0
+  r0, r1, c0, c1 = (int(v) for v in win)
+
+  while True:
+    rs, re = max(r0, 0), min(r1, imsize[0])
+    cs, ce = max(c0, 0), min(c1, imsize[1])
+
+    if (rs >= re) or (cs >= ce):            # Window is off the image.
+      return None, None, nTouch
+
+    rowCount, colCount = maskProjections(Ip[rs:re, cs:ce])
+    nTouch += (re - rs) * (ce - cs)
+
+    m00 = np.sum(rowCount)
+    if (m00 == 0):
+      return None, None, nTouch
+
+    isCut = (rs > 0 and rowCount[0] > 0) or (re < imsize[0] and rowCount[-1] > 0) \
+         or (cs > 0 and colCount[0] > 0) or (ce < imsize[1] and colCount[-1] > 0)
+    if not isCut:
+      break
+
+    dr, dc = (r1 - r0 + 1) // 2, (c1 - c0 + 1) // 2
+    r0, r1, c0, c1 = r0 - dr, r1 + dr, c0 - dc, c1 + dc
+
+  m10 = np.dot(colCount.astype(np.float64), np.arange(cs, ce, dtype=np.float64))
+  m01 = np.dot(rowCount.astype(np.float64), np.arange(rs, re, dtype=np.float64))
+
+  return (m00, m10, m01), (rs, re, cs, ce), nTouch
+
+
 #
 #---------------------------------------------------------------------------
 #================================= Centroid ================================
@@ -107,9 +331,12 @@ class centroid(object):
   # @brief      Centroid track-pointer constructor.
   #
   # @param[in]  iPt      The initial track point coordinates.
-  #             params   The parameter structure.
+  #             params   The parameter structure (default: CfgCentroid()).
   #
-  def __init__(self, iPt=None, params=CfgCentroid()):
+  def __init__(self, iPt=None, params=None):
+
+    if params is None:
+      params = CfgCentroid()
 
     self.tparams = params
     self.haveMeas = False
@@ -120,6 +347,37 @@ class centroid(object):
     else:
       self.tpt = None
 
+    # Gated mode: last measurement, velocity, prediction, window used.
+    # Buffers are updated in place.
+    self.tlast   = None
+    self.tvel    = np.zeros((2,1))
+    self.tprd    = None
+    self.tbuf    = np.zeros((2,2))
+    self.gateWin = None
+
+    # Optional recorder of the processed states.
+    self.history = None
+
+    # Async interface: executor for the offloaded work (None is the event
+    # loop default), lock serializing it, and count of dropped frames.
+    self.executor = None
+    self.runLock  = threading.Lock()
+    self.runTail  = None
+    self.nDropped = 0
+
+    # Optional per-stage timing (see enableTiming).
+    self.timer = None
+
+    # Pyramid mode: pixels examined at each level (coarse, fine).
+    self.pyrTouch = None
+
+    # Incremental mode: previous mask, running moments, updates since
+    # the last full pass, and whether the last update was a full pass.
+    self.incMask  = None
+    self.incMom   = None
+    self.incCount = 0
+    self.incFull  = False
+
   #=============================== set ===============================
   #
   # @brief  Set parameters for the tracker.
@@ -151,10 +409,12 @@ class centroid(object):
   #
   # @brief  Return an empty state structure.
   #
+  # Its track point buffer is preallocated, so the state can be filled in
+  # place by ``process`` frame after frame.
   #
   def emptyState(self):
 
-    estate= TrackState(tpt=np.array([]), haveMeas=False)
+    estate= TrackState(tpt=np.full((2,1), np.nan), haveMeas=False)
 
     return estate
 
@@ -174,11 +434,17 @@ class centroid(object):
   #
   # @brief  Return the track-pointer state.
   #
+  # @param[in]  tstate  Optional state to fill in place (else a new one).
+  #
   # @param[out] tstate  The track point state structure.
   #
-  def getState(self):
+  def getState(self, tstate = None):
+
+    if tstate is None:
+      tstate = TrackState(tpt=self.tpt, haveMeas=self.haveMeas)
+    else:
+      tstate.fill(self.tpt, self.haveMeas)
 
-    tstate = TrackState(tpt=self.tpt, haveMeas=self.haveMeas)
     return tstate
 
   #=============================== offset ==============================
@@ -207,48 +473,410 @@ class centroid(object):
 
   #============================== predict ==============================
   #
-  # @brief  Predict.  This is a no-op.
+  # @brief  Predict.  This is a no-op unless in gated mode.
+  #
+  # In gated mode, the track point is predicted from the last measurement
+  # under a constant velocity assumption.  No prediction if the target
+  # was lost.
   #
   def predict(self):
-    pass
+
+    if not getattr(self.tparams, 'gated', False):
+      return
+
+    if self.tlast is None:
+      self.tprd = None
+    else:
+      self.tprd = np.add(self.tlast, self.tvel, out=self.tbuf[:,1:2])
 
   #============================== measure ==============================
   #
   # @brief  Measure the track point from the given image.
   #
   # @param[in]  I         The input image.
+  # @param[in]  tstate    Optional state to fill in place.
   #
   # @param[out] mstate    The measured state.
   #
-  def measure(self, I):
+  def measure(self, I, tstate = None):
+
+    Ip = self.preprocess(I)
+
+    timer = self.timer
+    if timer is not None:
+      t0 = timer.now()
+
+    m00, m10, m01 = self.moments(Ip)
+
+    if timer is not None:
+      timer.toc('centroid', t0)
+
+    if m00 == 0:
+      self.setPoint(None, None, tstate)
+    else:
+      self.setPoint(m10 / m00, m01 / m00, tstate)   # x,y in OpenCV
+
+    mstate = self.getState(tstate)
+
+    return mstate
+
+  #============================== setPoint =============================
+  #
+  # @brief  Set the measured track point (None if no measurement).
+  #
+  # The point is written into the buffer of the given state if there is
+  # one, otherwise a new 2x1 array is made.
+  #
+  # @param[in]  x       Column (x) coordinate in OpenCV convention.
+  # @param[in]  y       Row (y) coordinate in OpenCV convention.
+  # @param[in]  tstate  Optional state whose buffer receives the point.
+  #
+  def setPoint(self, x, y, tstate = None):
+
+    if x is None:
+      self.tpt = None
+      self.haveMeas = False
+      return
+
+    if (tstate is not None) and isinstance(tstate.tpt, np.ndarray) \
+                            and (tstate.tpt.shape == (2,1)):
+      self.tpt = tstate.tpt
+      self.tpt[0,0] = x
+      self.tpt[1,0] = y
+    else:
+      self.tpt = np.array([[x], [y]], dtype=np.float64)
 
+    self.haveMeas = True
+
+  #============================= preprocess ============================
+  #
+  # @brief  Apply the improcessor, if any, to the input image.
+  #
+  # Compact (packed or run) masks are binary already and pass through as is,
+  # as do images wrapped as already preprocessed.
+  #
+  # @param[in]  I     The input image.
+  #
+  # @param[out] Ip    The preprocessed image.
+  #
+  def preprocess(self, I):
+
+    if isinstance(I, Preprocessed):
+      return I.image
+
+    if isinstance(I, CompactMask):
+      return I
 
     if hasattr(self.tparams, 'improcessor') and self.tparams.improcessor:
+      timer = self.timer
+      if timer is not None:
+        t0 = timer.now()
+
       Ip = self.tparams.improcessor.apply(I)
+
+      if timer is not None:
+        timer.toc('improcessor', t0)
     else:
       Ip = I
 
-    # y,x in OpenCV
-    ibin, jbin = np.nonzero(Ip)
+    return Ip
 
-    if ibin.size == 0:
-      self.tpt = None
-      self.haveMeas = False
+  #============================== moments ==============================
+  #
+  # @brief  Zeroth and first order moments of the foreground pixels.
+  #
+  # Uses the configured engine over the full image, unless a gated
+  # prediction is available and the gating window finds the target.
+  # Full image searches are coarse-to-fine if a pyramid factor is set.
+  # Compact masks always get full image moments from their own representation.
+  #
+  # @param[in]  Ip    The (preprocessed) mask image.
+  #
+  # @param[out] m00   Pixel count.
+  # @param[out] m10   Sum of column (x) coordinates.
+  # @param[out] m01   Sum of row (y) coordinates.
+  #
+  def moments(self, Ip):
+
+    if isinstance(Ip, CompactMask):
+      return Ip.moments()
+
+    if getattr(self.tparams, 'incremental', False):
+      return self._incrementalMoments(Ip)
+
+    if self.tprd is not None:
+      mom = self._gatedMoments(Ip)
+      if mom is not None:
+        return mom
+
+    self.gateWin = None
+
+    if (getattr(self.tparams, 'pyrFactor', 0) > 1):
+      return self._pyramidMoments(Ip)
+
+    if (getattr(self.tparams, 'engine', 'moments') == 'nonzero'):
+      ibin, jbin = np.nonzero(Ip)           # y,x in OpenCV
+      return ibin.size, np.sum(jbin), np.sum(ibin)
     else:
-      # x,y in OpenCV
-      self.tpt = np.array([np.mean(jbin), np.mean(ibin)]).reshape(-1,1)
-      self.haveMeas = True
+      return maskMoments(Ip)
+
+  #======================== _incrementalMoments ========================
+  #
+  # @brief  Update the running moments from the change in the mask.
+  #
+  # The pixels that differ from the previous mask (their XOR) are added
+  # to or removed from the running sums.  A full pass is done on the first
+  # frame, every incRefresh updates, on a size change, or when the number
+  # of changed pixels makes an update not worth it.
+  #
+  def _incrementalMoments(self, Ip):
+
+    Ib = Ip if (Ip.dtype == bool) else (Ip != 0)
+
+    if (self.incMask is None) or (self.incMask.shape != Ib.shape) \
+                              or (self.incCount >= self.tparams.incRefresh):
+      return self._fullIncremental(Ib)
+
+    lind = np.flatnonzero(Ib ^ self.incMask)
+    if (lind.size > self.tparams.incMaxDelta * Ib.size):
+      return self._fullIncremental(Ib)
+
+    isAdd = np.ravel(Ib)[lind]
+    self.incMask.flat[lind] = isAdd
+
+    ri, ci = np.divmod(lind, Ib.shape[1])
+    self._updateMoments(ri, ci, isAdd)
+
+    return tuple(self.incMom)
+
+  #========================== _fullIncremental =========================
+  #
+  # @brief  Full pass that (re)initializes the incremental moment state.
+  #
+  def _fullIncremental(self, Ib):
+
+    if (self.incMask is None) or (self.incMask.shape != Ib.shape):
+      self.incMask = np.array(Ib, dtype=bool)
+    else:
+      np.copyto(self.incMask, Ib)
+
+    rowCount, colCount = maskProjections(self.incMask)
+    self.incMom = [int(np.sum(rowCount)),
+                   int(colCount @ np.arange(colCount.size)),
+                   int(rowCount @ np.arange(rowCount.size))]
+
+    self.incCount = 0
+    self.incFull  = True
+
+    return tuple(self.incMom)
+
+  #=========================== _updateMoments ==========================
+  #
+  # @brief  Add/remove changed pixels to/from the running moments.
+  #
+  # Integer arithmetic, so the running sums do not drift.
+  #
+  def _updateMoments(self, ri, ci, isAdd):
+
+    sgn = np.where(isAdd, 1, -1)
+
+    self.incMom[0] += int(np.sum(sgn))
+    self.incMom[1] += int(np.dot(sgn, ci))
+    self.incMom[2] += int(np.dot(sgn, ri))
+
+    self.incCount += 1
+    self.incFull   = False
+
+  #============================ measureEvents ==========================
+  #
+  # @brief  Measure the track point from pixel add/remove events.
+  #
+  # Incremental alternative to ``measure`` for event-style inputs.  The
+  # events are applied to the mask held by the incremental mode, hence a
+  # full mask must have been measured first.  Events that do not change
+  # the mask (adding a set pixel, removing an unset one) are ignored.
+  #
+  # @param[in]  addPts    Pixels turned on, 2 x K array of (x,y) coordinates.
+  # @param[in]  remPts    Pixels turned off, 2 x K array of (x,y) coordinates.
+  #
+  # @param[out] mstate    The measured state.
+  #
+  def measureEvents(self, addPts = None, remPts = None):
+
+    if self.incMask is None:
+      raise RuntimeError('Incremental mode needs a measured mask before events.')
+
+    imsize = self.incMask.shape
+
+    for pts, isOn in ((remPts, False), (addPts, True)):
+      if pts is None or np.size(pts) == 0:
+        continue
+      lind = np.unique(np.ravel_multi_index((pts[1], pts[0]), imsize))
+      lind = lind[self.incMask.flat[lind] != isOn]
+      self.incMask.flat[lind] = isOn
+      ri, ci = np.unravel_index(lind, imsize)
+      self._updateMoments(ri, ci, np.full(lind.size, isOn))
+
+    if (self.incCount >= self.tparams.incRefresh):
+      self._fullIncremental(self.incMask)
+
+    m00, m10, m01 = self.incMom
+
+    if m00 == 0:
+      self.setPoint(None, None)
+    else:
+      self.setPoint(m10 / m00, m01 / m00)           # x,y in OpenCV
 
     mstate = self.getState()
 
     return mstate
 
+  #=========================== _gatedMoments ===========================
+  #
+  # @brief  Moments of the foreground found within the gating window.
+  #
+  # The window is centered on the predicted point, with half-size given
+  # by the minimum size plus a gain times the last frame-to-frame motion.
+  # Cost depends on the window size, not the image size.
+  #
+  # @param[out] mom   Moments (m00, m10, m01), or None if nothing found.
+  #
+  def _gatedMoments(self, Ip):
+
+    gsize = self.tparams.gateMin + self.tparams.gateGain * np.abs(self.tvel[:,0])
+
+    win = (int(np.floor(self.tprd[1,0] - gsize[1])), int(np.ceil(self.tprd[1,0] + gsize[1])) + 1,
+           int(np.floor(self.tprd[0,0] - gsize[0])), int(np.ceil(self.tprd[0,0] + gsize[0])) + 1)
+
+    mom, self.gateWin, _ = windowMoments(Ip, win)
+    return mom
+
+  #========================== _pyramidMoments ==========================
+  #
+  # @brief  Coarse-to-fine moments of the foreground.
+  #
+  # The mask is sampled every pyrFactor pixels to get the coarse bounding
+  # box of the foreground.  The moments are then computed at full
+  # resolution within that box (padded to the neighboring samples), which
+  # grows if the foreground reaches one of its interior sides.  The result
+  # equals the full image moments whenever every foreground blob contains
+  # a sample pixel.  If the coarse level is empty, the full image is used.
+  #
+  def _pyramidMoments(self, Ip):
+
+    fac = int(self.tparams.pyrFactor)
+    Ic  = Ip[::fac, ::fac]
+
+    hitRows = np.flatnonzero(np.any(Ic, axis=1))
+    if (hitRows.size == 0):
+      self.pyrTouch = (Ic.size, Ip.size)
+      return maskMoments(Ip)
+
+    hitCols = np.flatnonzero(np.any(Ic[hitRows[0]:hitRows[-1]+1], axis=0))
+
+    win = (hitRows[0] * fac - fac + 1, hitRows[-1] * fac + fac,
+           hitCols[0] * fac - fac + 1, hitCols[-1] * fac + fac)
+
+    mom, _, nTouch = windowMoments(Ip, win)
+    self.pyrTouch  = (Ic.size, nTouch)
+
+    return mom
+
+  #============================ measureBatch ===========================
+  #
+  # @brief  Measure the track points for a stack of images.
+  #
+  # Vectorized equivalent of calling ``measure`` on each frame in turn.
+  # The stack is reduced along the frame axis a chunk at a time, so that
+  # memory mapped stacks never get fully loaded.  If an improcessor is
+  # configured, it is applied per frame prior to the reduction.  The
+  # tracker state ends up as it would after the last per-frame call.
+  #
+  # @param[in]  Is        Image stack (N x H x W), array or memmap.
+  # @param[in]  nChunk    Number of frames to reduce at a time.
+  #
+  # @param[out] tpts      Track points (N x 2) in OpenCV (x,y) order.
+  #                       Frames without a measurement are NaN.
+  # @param[out] haveMeas  Measurement flags (N).
+  #
+  def measureBatch(self, Is, nChunk = 32):
+
+    nFrames  = np.shape(Is)[0]
+    tpts     = np.full((nFrames, 2), np.nan)
+    haveMeas = np.zeros(nFrames, dtype=bool)
+
+    for n0 in range(0, nFrames, nChunk):
+      n1 = min(n0 + nChunk, nFrames)
+      Ip = self._preprocessStack(Is[n0:n1])
+      tpts[n0:n1,:], haveMeas[n0:n1] = self._measureStack(Ip)
+
+    if (nFrames > 0):
+      if haveMeas[-1]:
+        self.tpt = tpts[-1,:].reshape(-1,1)
+        self.haveMeas = True
+      else:
+        self.tpt = None
+        self.haveMeas = False
+
+    return tpts, haveMeas
+
+  #========================== _preprocessStack =========================
+  #
+  # @brief  Apply the improcessor, if any, to each frame of a stack.
+  #
+  def _preprocessStack(self, Is):
+
+    if hasattr(self.tparams, 'improcessor') and self.tparams.improcessor:
+      return np.stack([self.tparams.improcessor.apply(I) for I in Is])
+    else:
+      return np.asarray(Is)
+
+  #============================ _measureStack ==========================
+  #
+  # @brief  Centroids of a (preprocessed) stack from row/column counts.
+  #
+  # Same integer sums as the per-frame mean of ``np.nonzero`` indices,
+  # hence identical results.
+  #
+  def _measureStack(self, Ip):
+
+    if (Ip.dtype != bool):
+      Ip = (Ip != 0)
+
+    rowCount = np.sum(Ip, axis=2, dtype=np.int64)
+    colCount = np.sum(Ip, axis=1, dtype=np.int64)
+    pixCount = np.sum(rowCount, axis=1)
+
+    haveMeas = pixCount > 0
+    tpts     = np.full((Ip.shape[0], 2), np.nan)
+
+    tpts[haveMeas,0] = (colCount[haveMeas] @ np.arange(Ip.shape[2])) \
+                          / pixCount[haveMeas]
+    tpts[haveMeas,1] = (rowCount[haveMeas] @ np.arange(Ip.shape[1])) \
+                          / pixCount[haveMeas]
+
+    return tpts, haveMeas
+
   #============================== correct ==============================
   #
-  # @brief  Correct.  This is a no-op.
+  # @brief  Correct.  This is a no-op unless in gated mode.
+  #
+  # In gated mode, the velocity is updated from the frame-to-frame change
+  # of the measured track point.  Losing the target resets the motion.
   #
   def correct(self):
-    pass
+
+    if not getattr(self.tparams, 'gated', False):
+      return
+
+    if self.haveMeas:
+      if self.tlast is not None:
+        np.subtract(self.tpt, self.tlast, out=self.tvel)
+      self.tlast = self.tbuf[:,0:1]
+      self.tlast[...] = self.tpt
+    else:
+      self.tlast = None
+      self.tvel[...] = 0
 
   #=============================== adapt ===============================
   #
@@ -262,14 +890,237 @@ class centroid(object):
   #
   # @brief  Process the input image according to centroid tracking.
   #
-  # @param[in]  I   The input image.
+  # @param[in]  I         The input image.
+  # @param[in]  tstate    Optional state to fill in place (see ``emptyState``).
+  # @param[in]  tCapture  Frame capture time, on the timer clock (optional,
+  #                       only used when timing is enabled).
   #
-  def process(self, I):
+  def process(self, I, tstate = None, tCapture = None):
+
+    if self.timer is not None:
+      tBegin = self.timer.now()
+
+    self.predict()
+    tState = self.measure(I, tstate)
+    self.correct()
+
+    if self.timer is not None:
+      self.stampState(tState, tBegin, tCapture)
+
+    if self.history is not None:
+      self.history.record(tState)
 
-    tState = self.measure(I)
     return tState
 
 
+  #============================ enableTiming ===========================
+  #
+  # @brief  Enable per-stage timing of the processing.
+  #
+  # Stage durations go to rolling windows (see ``timingSummary``), and the
+  # processed states carry capture and completion timestamps.
+  #
+  # @param[in]  window  Number of most recent frames summarized.
+  # @param[in]  timer   Optional StageTimer to use (e.g., shared, or with
+  #                     a specific clock).
+  #
+  def enableTiming(self, window = 1024, timer = None):
+
+    self.timer = StageTimer(window) if timer is None else timer
+
+  #============================ disableTiming ==========================
+  #
+  # @brief  Disable timing.  The hooks then cost a None test each.
+  #
+  def disableTiming(self):
+
+    self.timer = None
+
+  #============================ timingSummary ==========================
+  #
+  # @brief  Percentile summaries of the stage durations (see StageTimer).
+  #
+  # Stages are the tracker specific ones (e.g., 'improcessor', 'centroid',
+  # 'label'), plus 'process' for the whole call and 'latency' from capture
+  # to completion.  Empty if timing is not enabled.
+  #
+  def timingSummary(self, pcts = (50, 90, 99)):
+
+    if self.timer is None:
+      return dict()
+
+    return self.timer.summary(pcts)
+
+  #============================= stampState ============================
+  #
+  # @brief  Set the state timestamps and record the whole frame timing.
+  #
+  def stampState(self, tState, tBegin, tCapture):
+
+    tState.tCapture = tBegin if tCapture is None else tCapture
+    tState.tDone    = self.timer.toc('process', tBegin)
+    self.timer.record('latency', tState.tDone - tState.tCapture)
+
+  #============================= setExecutor ===========================
+  #
+  # @brief  Set the executor that the async methods offload work to.
+  #
+  # @param[in]  executor  A concurrent.futures executor, or None for the
+  #                       event loop default executor.
+  #
+  def setExecutor(self, executor):
+
+    self.executor = executor
+
+  #============================= __getstate__ ==========================
+  #
+  # @brief  State for pickling and deep copies.
+  #
+  # The async lock and call chain cannot be copied, and the executor
+  # belongs to this process, so none are kept.  The copy gets a new lock
+  # and the default executor.
+  #
+  def __getstate__(self):
+
+    state = self.__dict__.copy()
+    state['runLock']  = None
+    state['runTail']  = None
+    state['executor'] = None
+
+    return state
+
+  #============================= __setstate__ ==========================
+  #
+  # @brief  Restore from pickled (or copied) state.
+  #
+  def __setstate__(self, state):
+
+    self.__dict__.update(state)
+    self.runLock = threading.Lock()
+
+  #============================== ameasure =============================
+  #
+  # @brief  Async version of ``measure``, run on the executor.
+  #
+  # Calls are serialized and processed in submission order, even when
+  # several are awaited together (e.g., with asyncio.gather) on an executor
+  # with many workers, so the tracker state is never updated by two frames
+  # at once or out of frame order.  Cancelling a call whose work has not
+  # started yet drops that frame.
+  #
+  async def ameasure(self, I, tstate = None):
+
+    return await self._serialRun(self.measure, I, tstate)
+
+  #============================== aprocess =============================
+  #
+  # @brief  Async version of ``process``, run on the executor.
+  #
+  # Same ordering, serialization and cancellation behavior as ``ameasure``.
+  #
+  async def aprocess(self, I, tstate = None):
+
+    return await self._serialRun(self.process, I, tstate)
+
+  #============================== astream ==============================
+  #
+  # @brief  Turn an async frame source into an async stream of states.
+  #
+  # The source is consumed concurrently with the processing.  With
+  # dropStale set, only the most recent frame waits for processing, so
+  # frames that go stale while the tracker is busy are dropped (and
+  # counted in nDropped).  Otherwise every frame is processed in order.
+  #
+  # @param[in]  source      Async iterable of frames.
+  # @param[in]  dropStale   Drop frames that are not the latest (default).
+  #
+  async def astream(self, source, dropStale = True):
+
+    if not dropStale:
+      async for I in source:
+        yield await self.aprocess(I)
+      return
+
+    import asyncio
+
+    pending = asyncio.Queue(maxsize=1)
+    isDone  = object()
+    failure = []
+
+    async def pump():
+      try:
+        async for I in source:
+          if pending.full():
+            pending.get_nowait()
+            pending.task_done()
+            self.nDropped += 1
+          pending.put_nowait(I)
+      except Exception as err:
+        failure.append(err)
+
+      await pending.join()
+      pending.put_nowait(isDone)
+
+    pumpTask = asyncio.ensure_future(pump())
+    try:
+      while True:
+        I = await pending.get()
+        pending.task_done()
+        if I is isDone:
+          break
+        yield await self.aprocess(I)
+    finally:
+      pumpTask.cancel()
+
+    if failure:
+      raise failure[0]
+
+  #============================= _serialRun ============================
+  #
+  # @brief  Run a tracker method on the executor, after all earlier calls.
+  #
+  # Each call waits for the previous one to finish before submitting its
+  # work, so calls reach the executor one at a time in submission order.
+  # The lock in _serialCall still covers a call that is cancelled while
+  # its work runs, since that work carries on after the next call starts.
+  #
+  async def _serialRun(self, func, I, tstate):
+
+    import asyncio                      # Loaded already by the running loop.
+
+    prevDone     = self.runTail
+    isDone       = asyncio.Event()
+    self.runTail = isDone
+
+    def release(*args):
+      isDone.set()
+      if self.runTail is isDone:
+        self.runTail = None
+
+    try:
+      if prevDone is not None:
+        await prevDone.wait()
+
+      loop = asyncio.get_running_loop()
+      return await loop.run_in_executor(self.executor, self._serialCall,
+                                        func, I, tstate)
+    finally:
+      # If cancelled while waiting, the next call still waits on this one's
+      # predecessor, so hand the release on to it.
+      if prevDone is None or prevDone.is_set():
+        release()
+      else:
+        asyncio.ensure_future(prevDone.wait()).add_done_callback(release)
+
+  #============================= _serialCall ===========================
+  #
+  # @brief  Run a tracker method under the tracker lock (executor side).
+  #
+  def _serialCall(self, func, I, tstate):
+
+    with self.runLock:
+      return func(I, tstate)
+
   #============================ displayState ===========================
   #
   # @brief  Displays the current track pointer measurement.
@@ -281,6 +1132,7 @@ class centroid(object):
   def displayState(self, dstate = None, ax=None):
 
     if ax is None:
+      import matplotlib.pyplot as plt
       ax = plt.gca()
 
     if isinstance(dstate, TrackState):
@@ -294,6 +1146,18 @@ class centroid(object):
 
 
 
+  #============================ attachHistory ==========================
+  #
+  # @brief  Record every processed state into a track history.
+  #
+  # Applies to single track point trackers.  Pass None to detach.
+  #
+  # @param[in]  history   A trackpointer.history.TrackHistory instance.
+  #
+  def attachHistory(self, history):
+
+    self.history = history
+
   #========================= displayDebugState =========================
   #
   # @brief  Displays internally stored intermediate process output.
@@ -310,8 +1174,16 @@ class centroid(object):
   # @brief  Use opencv display routines to plot the trackpoint along with
   #         the given image.
   #
-  def display_cv(self, I, ratio = None, window_name="track point "):
-  
+  # Given a started trackpointer.utils.displaySink, the image and track
+  # point are posted to it instead, so the call does not wait on drawing
+  # (the sink's ratio and window then apply).
+  #
+  def display_cv(self, I, ratio = None, window_name="track point ", sink = None):
+
+    if sink is not None:
+      sink.put(I, self.tpt if self.haveMeas else None)
+      return
+
     import ivapy.display_cv as display
 
     if (self.haveMeas):
@@ -36,12 +36,12 @@
 #============================== centroidMulti ==============================
 
 import numpy as np
-import cv2
 
-import skimage.morphology as morph
-from skimage.measure import regionprops, label
-from scipy.signal import convolve2d
-from trackpointer.centroid import centroid, TrackState, CfgCentroid
+from trackpointer.centroid import centroid, TrackState, CfgCentroid, Preprocessed
+from trackpointer.masks import CompactMask, RunMask
+import trackpointer.components as components
+from trackpointer.association import associator
+from trackpointer.filterbank import cvBank
 
 
 #
@@ -56,8 +56,43 @@ class CfgCentMulti(CfgCentroid):
 
   minArea   - Minimum area acceptable (anything less is not a target).
   maxArea   - Maximum area acceptable (anything more is not a target).
-  measProps - Flag to determine whether to keep the region properties.
+  measProps - Flag to determine whether to keep the region properties, as
+              a table with one row per target (see propColumns).
+  propColumns - Region properties table columns: any of 'label', 'area',
+              'centroid', 'bbox', 'orientation', 'meanIntensity' (of the
+              input image), see trackpointer.components.regionTable.
   keepLabel - Flag to keep the label image, in case needed later.
+  assocGate - Gating distance for associating the targets across frames,
+              giving them persistent track IDs (0: no association).
+  assocMaxMiss - Frames a target track may go unmatched before it ends.
+  assocFilter - Flag to filter the target tracks with a bank of constant
+              velocity Kalman filters (see getTracks).  Association then
+              gates about the predicted target positions.
+  filtProcNoise - Filter acceleration noise variance (pixels^2/frame^4).
+  filtMeasNoise - Filter position measurement noise variance (pixels^2).
+  maxTargets - Maximum number of targets (0: no limit).  If set, only the
+              largest targets are kept, ordered by decreasing area (their
+              labels too), and only theirs are measured.
+  ccBackend - Connected components backend: 'skimage', 'cv2', 'scipy',
+              'parallel' (strips labeled on all cores, for large images),
+              or 'auto' to pick the fastest one on the first frame.  All
+              give the same results (see trackpointer.components).
+  ccTile    - Tile size for incremental labeling, which relabels only the
+              tiles that changed since the previous frame (0: off).  For
+              mostly static masks.  Does not apply with measProps or
+              keepLabel.
+  ccBand    - Rows per band for out-of-core labeling, which streams the
+              image (e.g., a np.memmap of a mosaic) in row bands instead
+              of loading it (0: off).  The improcessor, if any, is applied
+              per band, so should be pointwise.  Does not apply with
+              measProps or keepLabel.
+  gated     - Flag to label only within windows about the targets of the
+              previous frame (see measureGated).  The windows pad the
+              target boxes by gateMin plus gateGain times the target
+              motion (known if association filtering, else zero).  Does
+              not apply with measProps or keepLabel.
+  gateScan  - Frames between full image scans, which find new targets, in
+              gated mode (0: only when a target is lost).
 
   '''
   #============================= __init__ ============================
@@ -88,9 +123,15 @@ class CfgCentMulti(CfgCentroid):
     @param[out] default_dict  Dictionary populated with minimal set of
                               default settings.
     '''
-    default_dict = dict(minArea = 0, maxArea = float('inf'), \
+    default_dict = CfgCentroid.get_default_settings()
+    default_dict.update(minArea = 0, maxArea = float('inf'), \
                         regConn = 1, \
-                        measProps = False, keepLabel = False)
+                        measProps = False, keepLabel = False, maxTargets = 0, \
+                        assocGate = 0, assocMaxMiss = 0, assocFilter = False, \
+                        filtProcNoise = 1.0, filtMeasNoise = 1.0, \
+                        propColumns = ['label', 'area', 'centroid', 'bbox'], \
+                        ccBackend = 'skimage', ccTile = 0, ccBand = 0, \
+                        gateScan = 30)
     return default_dict
 
 
@@ -110,7 +151,7 @@ class centroidMulti(centroid):
   #
   # @brief      Centroid track-pointer constructor.
   #
-  # @param[in]  params  Parameter settings.
+  # @param[in]  params  Parameter settings (default: CfgCentMulti()).
   # @param[in]  iPt     Initial track point coordinates.
   #
   #
@@ -120,13 +161,40 @@ class centroidMulti(centroid):
   #         this particular choice made? Seems to lack flexibility
   #         or is it related to best practice?
   #
-  def __init__(self, iPt=None, params=CfgCentMulti()):
+  def __init__(self, iPt=None, params=None):
+
+    if params is None:
+      params = CfgCentMulti()
 
     super(centroidMulti,self).__init__(iPt, params)
 
     self.labelIm    = None
     self.trackProps = None
 
+    # Target association: track IDs of the current targets (if enabled).
+    self.tid   = None
+    self.assoc = None
+    if self.get('assocGate') > 0:
+      filt = None
+      if self.get('assocFilter'):
+        filt = cvBank(self.get('filtProcNoise'), self.get('filtMeasNoise'))
+      self.assoc = associator(self.get('assocGate'), self.get('assocMaxMiss'), filt)
+
+    # Connected components backend ('auto' until calibrated).  Kept here,
+    # since the configuration may be shared by other trackers.
+    self.ccBackend = self.get('ccBackend')
+
+    # Incremental labeling (if enabled).
+    self.tiler = None
+    if self.get('ccTile') > 0:
+      self.tiler = components.tileLabeler(self.get('ccTile'), self.tparams.regConn,
+                                          self.ccBackend)
+
+    # Gated mode: target boxes, frames since the last full scan, and the
+    # windows last labeled (None if a full scan).
+    self.gateBox   = None
+    self.gateCount = 0
+    self.gateWins  = None
 
   #=============================== set ===============================
   #
@@ -146,28 +214,53 @@ class centroidMulti(centroid):
   #
   # @brief  Get parameter of the tracker.
   #
+  # Parameters missing from the configuration (e.g., from an older
+  # configuration file) take their default values.
+  #
   # @param[in]  fname       Name of parameter.
   #
   # @param[out] fval        Value of parameter.
   #
   def get(self, fname):
 
-    # @todo    fill out.
-
-    pass
+    try:
+      return getattr(self.tparams, fname)
+    except AttributeError:
+      return CfgCentMulti.get_default_settings()[fname]
 
   #============================== measure ==============================
   #
   # @brief  Measure the track point from the given image.
   #
-  # @param[in]  I   The input image.
+  # @param[in]  I       The input image.
+  # @param[in]  tstate  Optional state to fill in place.
   #
-  def measure(self, I):
+  def measure(self, I, tstate = None):
 
-    if hasattr(self.tparams, 'improcessor') and self.tparams.improcessor:
-      Ip = self.tparams.improcessor.apply(I)
-    else:
-      Ip = np.copy(I)
+    if self.get('ccBand') > 0 and not isinstance(I, CompactMask) \
+                               and not (self.tparams.measProps or self.tparams.keepLabel):
+      return self.measureBands(I, tstate)
+
+    Ip = self.preprocess(I)
+
+    if isinstance(Ip, RunMask) and not (self.tparams.measProps or self.tparams.keepLabel):
+      return self.measureRuns(Ip, tstate)
+
+    if isinstance(Ip, CompactMask):           # Labeling needs dense mask.
+      Ip = Ip.unpack()
+
+    wins = self.gateWindows()
+    if wins is not None:
+      mstate = self.measureGated(Ip, wins, tstate)
+      if mstate is not None:
+        return mstate
+
+    if Ip.dtype != bool:                      # Binary mask, not label image.
+      Ip = Ip != 0
+
+    timer = self.timer
+    if timer is not None:
+      t0 = timer.now()
 
     # [08/30 PAV: CODE BELOW COMMENTED OUT DUE TO BEING SLOW AND KINDA CRAPPY.]
     # [09/07 PAV: Also seems redundant since it runs regionprops anyhow.
@@ -177,29 +270,53 @@ class centroidMulti(centroid):
 
     # Link to scikit [region props](https://scikit-image.org/docs/stable/api/skimage.measure.html#skimage.measure.regionprops)
 
-    if (self.tparams.minArea > 0):
-      morph.remove_small_objects(Ip, self.tparams.minArea, 1, out = Ip)
+    if self.ccBackend == 'auto':
+      self.calibrate(Ip)
 
-    (Il, nl) = label(Ip, None, True, self.tparams.regConn)
+    if self.tiler is not None and not (self.tparams.measProps or self.tparams.keepLabel):
+      return self.measureTiled(Ip, tstate)
+
+    nTarg = self.get('maxTargets')
+    (Il, nl, area, cpt) = components.labelRegions(Ip, self.tparams.regConn,
+                                              self.ccBackend, not nTarg)
     # @todo Consider how might use nl return value.
+    if timer is not None:
+      t0 = timer.toc('label', t0)
+
+    # Area limits, applied to the label statistics of the single labeling.
+    # With a target limit, the largest are kept, and only they get measured.
+    # Kept labels are renumbered (in raster order, else by area) in outputs.
+    isKept = self.areaLimits(area)
+    keep   = None
+    if nTarg > 0:
+      keep = components.largest(area, isKept, nTarg)
+      cpt  = components.labelStats(Il, nl, keep, Ip)[1] if cpt is None else cpt[:,keep]
+    elif not np.all(isKept):
+      keep = np.flatnonzero(isKept)
+      cpt  = cpt[:, keep]
+
+    if keep is not None:
+      area = area[keep]
+      if timer is not None:
+        t0 = timer.toc('select', t0)
 
     if self.tparams.keepLabel:
-      self.labelImage = Il
-
-    regProps = regionprops(Il)
+      self.labelImage = Il if keep is None else components.relabel(Il, nl, keep)
 
     if self.tparams.measProps:
-      self.trackProps = regProps
-      binReg = []
-      for ri in self.trackProps:
-        if (ri.area < self.tparams.maxArea):
-          binReg.append([ri.centroid[1], ri.centroid[0]])
-    else:
-      binReg = []
-      for ri in regProps:
-        binReg.append([ri.centroid[1], ri.centroid[0]])
+      self.trackProps = components.regionTable(Il, nl, self.get('propColumns'),
+                                       I if isinstance(I, np.ndarray) else None,
+                                       area, cpt, Ip, keep)
+      if timer is not None:
+        timer.toc('regionTable', t0)
+
+    self.tpt = cpt                            # 2 x N, OpenCV (x,y) order.
 
-    self.tpt = np.array(binReg).T # from N x 2 to 2 x N
+    if self.get('gated') and not (self.tparams.measProps or self.tparams.keepLabel):
+      self.gateBox   = components.regionTable(Il, nl, ['bbox'], area=area, cpt=cpt,
+                                              Ib=Ip, keep=keep)['bbox']
+      self.gateCount = 0
+      self.gateWins  = None
 
     # print(f"Took {time.time() - start} before stupid convolution")
     # # Compute convolution scores
@@ -236,7 +353,309 @@ class centroidMulti(centroid):
     else:
       self.haveMeas = self.tpt.shape[1] > 0
 
-    mstate = self.getState()
+    self.associate()
+
+    mstate = self.getState(tstate)
+
+    return mstate
+
+  #============================= gateWindows ===========================
+  #
+  # @brief  Labeling windows about the predicted targets, in gated mode.
+  #
+  # Each previous target box shifts by the target motion, and is padded by
+  # gateMin plus gateGain times the motion.  The motion is that of the
+  # filtered track of the target if association filtering, else zero.
+  #
+  # @param[out] wins    Windows (K x 4, as half-open (r0, r1, c0, c1)), or
+  #                     None if a full scan is due.
+  #
+  def gateWindows(self):
+
+    if not self.get('gated') or self.tparams.measProps or self.tparams.keepLabel:
+      return None
+
+    if self.gateBox is None or len(self.gateBox) == 0:
+      return None
+
+    if self.get('gateScan') > 0 and self.gateCount >= self.get('gateScan'):
+      return None
+
+    vel = np.zeros((2, len(self.gateBox)))
+    if self.assoc is not None and self.assoc.filt is not None:
+      vel = self.assoc.filt.x[2:, np.searchsorted(self.assoc.ids, self.tid)]
+
+    pad = self.get('gateMin') + self.get('gateGain') * np.abs(vel)
+
+    wins = np.empty((len(self.gateBox), 4), dtype=np.int64)
+    wins[:,0] = np.floor(self.gateBox[:,0] + vel[1] - pad[1])
+    wins[:,1] = np.ceil(self.gateBox[:,2] + vel[1] + pad[1])
+    wins[:,2] = np.floor(self.gateBox[:,1] + vel[0] - pad[0])
+    wins[:,3] = np.ceil(self.gateBox[:,3] + vel[0] + pad[0])
+
+    return wins
+
+  #============================= measureGated ==========================
+  #
+  # @brief  Measure the track points from the mask within windows only.
+  #
+  # Labeling is restricted to the (merged) windows, which grow whenever a
+  # component might extend beyond them, so the targets found are those a
+  # full image labeling gives (see trackpointer.components.labelWindows).
+  # Cost is proportional to the window area.  Targets appearing elsewhere
+  # are found at the next full scan.
+  #
+  # @param[in]  Ip      The (preprocessed) mask image.
+  # @param[in]  wins    Windows (K x 4), see gateWindows.
+  # @param[in]  tstate  Optional state to fill in place.
+  #
+  # @param[out] mstate  The measured state, or None if a target was lost
+  #                     (so a full scan is needed).
+  #
+  def measureGated(self, Ip, wins, tstate = None):
+
+    timer = self.timer
+    if timer is not None:
+      t0 = timer.now()
+
+    area, cpt, bbox, wins = components.labelWindows(Ip, wins, self.tparams.regConn,
+                                                    self.ccBackend)
+
+    keep = self.selectTargets(area)
+    if timer is not None:
+      timer.toc('label', t0)
+
+    if np.size(keep) < len(self.gateBox):
+      return None
+
+    self.tpt       = cpt[:, keep]
+    self.gateBox   = bbox[keep]
+    self.gateCount += 1
+    self.gateWins  = wins
+    self.haveMeas  = self.tpt.shape[1] > 0
+
+    self.associate()
+
+    mstate = self.getState(tstate)
+
+    return mstate
+
+  #============================= measureTiled ==========================
+  #
+  # @brief  Measure the track points with incremental (tiled) labeling.
+  #
+  # Same targets as the full image labeling, with a cost that scales with
+  # the area that changed since the previous frame (see
+  # trackpointer.components.tileLabeler).
+  #
+  # @param[in]  Ib      The binary mask.
+  # @param[in]  tstate  Optional state to fill in place.
+  #
+  def measureTiled(self, Ib, tstate = None):
+
+    timer = self.timer
+    if timer is not None:
+      t0 = timer.now()
+
+    area, cpt, bbox = self.tiler.update(Ib)
+    keep = self.selectTargets(area)
+    if timer is not None:
+      timer.toc('label', t0)
+
+    self.tpt = cpt[:, keep]
+    if self.get('gated'):
+      self.gateBox   = bbox[keep]
+      self.gateCount = 0
+      self.gateWins  = None
+    self.haveMeas = self.tpt.shape[1] > 0
+
+    self.associate()
+
+    mstate = self.getState(tstate)
+
+    return mstate
+
+  #============================= measureBands ==========================
+  #
+  # @brief  Measure the track points, streaming the image in row bands.
+  #
+  # Only a band of rows is in memory at a time (see
+  # trackpointer.components.bandRegions), so the image can be a memory
+  # mapped mosaic larger than memory.  The targets are those of the full
+  # image labeling, in the same order.
+  #
+  # @param[in]  I       The input image (H x W array), or Preprocessed mask.
+  # @param[in]  tstate  Optional state to fill in place.
+  #
+  def measureBands(self, I, tstate = None):
+
+    prep = self.preprocess
+    if isinstance(I, Preprocessed):
+      I, prep = I.image, None
+
+    if self.ccBackend == 'auto':     # Calibrate on the first band.
+      Ib = I[:self.get('ccBand')]
+      self.calibrate(np.asarray(Ib if prep is None else prep(Ib)) != 0)
+
+    timer = self.timer
+    if timer is not None:
+      t0 = timer.now()
+
+    area, cpt, key = [], [], []
+    for bArea, bCpt, bKey in components.bandRegions(I, self.get('ccBand'),
+                                                    self.tparams.regConn,
+                                                    self.ccBackend, prep):
+      isKept = self.areaLimits(bArea)         # Keep only the candidates.
+      area.append(bArea[isKept])
+      cpt.append(bCpt[:,isKept])
+      key.append(bKey[isKept])
+
+    order = np.argsort(np.concatenate(key))
+    area  = np.concatenate(area)[order]
+    cpt   = np.concatenate(cpt, axis=1)[:,order]
+
+    keep = self.selectTargets(area)
+    if timer is not None:
+      timer.toc('label', t0)
+
+    self.tpt      = cpt[:, keep]
+    self.haveMeas = self.tpt.shape[1] > 0
+
+    self.associate()
+
+    mstate = self.getState(tstate)
+
+    return mstate
+
+  #============================ selectTargets ==========================
+  #
+  # @brief  Targets among the labeled regions.
+  #
+  # Regions within the area limits, or the largest of them if there is a
+  # target limit (by decreasing area).
+  #
+  # @param[in]  area    Region areas.
+  #
+  # @param[out] keep    Target region indices.
+  #
+  def selectTargets(self, area):
+
+    isKept = self.areaLimits(area)
+    if self.get('maxTargets') > 0:
+      return components.largest(area, isKept, self.get('maxTargets'))
+
+    return np.flatnonzero(isKept)
+
+  #============================== associate ============================
+  #
+  # @brief  Associate the measured targets to the tracks (if enabled).
+  #
+  def associate(self):
+
+    if self.assoc is not None:
+      self.tid = self.assoc.update(self.tpt)
+
+  #============================== getTracks ============================
+  #
+  # @brief  Current target tracks (requires association).
+  #
+  # Includes the tracks not matched in the current frame but not yet
+  # ended.  Positions are the filtered estimates if filtering, else the
+  # last matched points.
+  #
+  # @param[out] ids     Track IDs (M).
+  # @param[out] pos     Track positions (2 x M).
+  # @param[out] vel     Track velocities (2 x M, pixels per frame), or None
+  #                     if not filtering.
+  #
+  def getTracks(self):
+
+    vel = None
+    if self.assoc.filt is not None:
+      vel = self.assoc.filt.velocity()
+
+    return self.assoc.ids, self.assoc.pos, vel
+
+  #============================== getState =============================
+  #
+  # @brief  Get the track state, with the track IDs if associating.
+  #
+  def getState(self, tstate = None):
+
+    tstate = super().getState(tstate)
+    tstate.tid = self.tid
+
+    return tstate
+
+  #============================ attachHistory ==========================
+  #
+  # @brief  Not supported: a track history holds one point per frame.
+  #
+  def attachHistory(self, history):
+
+    if history is not None:
+      raise TypeError('centroidMulti: track histories hold a single '
+                      'track point per frame.')
+    self.history = None
+
+  #============================= areaLimits ============================
+  #
+  # @brief  Flags of the regions within the area limits.
+  #
+  # Regions with minArea <= area <= maxArea are targets.
+  #
+  def areaLimits(self, area):
+
+    return (area >= self.tparams.minArea) & (area <= self.tparams.maxArea)
+
+  #============================= calibrate =============================
+  #
+  # @brief  Set the connected components backend of this tracker to the
+  #         fastest one (the configuration is left as is).
+  #
+  # @param[in]  Ib      Sample binary mask, representative of the image
+  #                     size and blob density (e.g., a first frame, or from
+  #                     trackpointer.components.randomBlobs).
+  #
+  # @param[out] times   Dictionary of backend name -> labeling time (s).
+  #
+  def calibrate(self, Ib):
+
+    self.ccBackend, times = components.calibrate(Ib, self.tparams.regConn)
+    if self.tiler is not None:
+      self.tiler.backend = self.ccBackend
+    return times
+
+  #============================ measureRuns ============================
+  #
+  # @brief  Measure the track points from a run (sparse) mask.
+  #
+  # Components come from run overlaps, with centroids from the run moments,
+  # so the mask is never rasterized.  Same results as the dense path.
+  # Region properties and label images need the dense path.
+  #
+  # @param[in]  Ir      The run mask.
+  # @param[in]  tstate  Optional state to fill in place.
+  #
+  def measureRuns(self, Ir, tstate = None):
+
+    timer = self.timer
+    if timer is not None:
+      t0 = timer.now()
+
+    area, self.tpt = Ir.regions(self.tparams.regConn)
+    isKept = self.areaLimits(area)
+    if self.get('maxTargets') > 0:
+      self.tpt = self.tpt[:, components.largest(area, isKept, self.get('maxTargets'))]
+    else:
+      self.tpt = self.tpt[:, isKept]
+    if timer is not None:
+      timer.toc('label', t0)
+    self.haveMeas  = self.tpt.shape[1] > 0
+
+    self.associate()
+
+    mstate = self.getState(tstate)
 
     return mstate
 
@@ -244,11 +663,22 @@ class centroidMulti(centroid):
   #
   # @brief  Process the input image according to centroid tracking.
   #
-  # @param[in]  I   The input image.
+  # @param[in]  I         The input image.
+  # @param[in]  tstate    Optional state to fill in place.
+  # @param[in]  tCapture  Frame capture time, on the timer clock (optional,
+  #                       only used when timing is enabled).
   #
-  def process(self, I):
+  def process(self, I, tstate = None, tCapture = None):
+
+    if self.timer is not None:
+      tBegin = self.timer.now()
 
-    self.measure(I)
+    tState = self.measure(I, tstate)
+
+    if self.timer is not None:
+      self.stampState(tState, tBegin, tCapture)
+
+    return tState
 
   #========================= regionProposal =========================
   #
@@ -260,6 +690,9 @@ class centroidMulti(centroid):
   def regionProposal(I):
     # [08/03 PAV: Code below is horrendous.  What is purpose here? There are better methods.]
     # [             Even the stackoverflow link below has one.                              ]
+    import cv2
+    from skimage.measure import regionprops
+
     Ip = I.astype(np.uint8)
     mask = np.zeros_like(Ip)
     cnts = cv2.findContours(Ip, cv2.RETR_EXTERNAL,
@@ -0,0 +1,1047 @@
+#=============================== components ==============================
+#
+# @brief    Connected components of binary masks, with pluggable backends.
+#
+# The region measurements of centroidMulti (label image, areas, centroids)
+# can come from scikit-image (label), OpenCV (connected components with
+# statistics) or scipy (ndimage label + center_of_mass), or from any of
+# them labeling image strips in parallel (for large images).
+# All backends give the same results: same connectivity semantics (1 for
+# 4-connected, 2 for 8-connected, as scikit-image), components labeled in
+# raster order of their first pixel, and identical areas and centroids.
+# Which one is fastest depends on the image size and blob density, hence
+# the calibration function.
+#
+#=============================== components ==============================
+
+#
+# @file     components.py
+#
+# @date     2026/10/17  [created]
+#
+#!NOTE:
+#!  set indent to 2 spaces.
+#!  do not indent function code.
+#!  set tab to 4 spaces with conversion to spaces.
+#
+#=============================== components ==============================
+
+import os
+import time
+
+import numpy as np
+
+
+#============================= labelSkimage ============================
+#
+# @brief  Components from scikit-image label, with vectorized statistics.
+#
+# Same areas and centroids as regionprops, without the per-region Python
+# objects (which dominate when there are many small regions).
+#
+def labelSkimage(Ib, conn, withCentroids = True):
+
+  from skimage.measure import label
+
+  Il, nl = label(Ib, None, True, conn)
+
+  if withCentroids:
+    area, cpt = labelStats(Il, nl, Ib = Ib)
+  else:
+    area, cpt = labelAreas(Il, nl, Ib), None
+
+  return Il, nl, area, cpt
+
+#=============================== labelCv2 ==============================
+#
+# @brief  Components from OpenCV connected components with statistics.
+#
+# Uses the Wu (SAUF) algorithm, which labels in raster order of the first
+# pixels (the default block based algorithm does not).  The order is then
+# checked and restored if needed, in case the labeling differs.  The
+# centroids come with the statistics, so are always returned.
+#
+def labelCv2(Ib, conn, withCentroids = True):
+
+  import cv2
+
+  nl, Il, stats, cents = cv2.connectedComponentsWithStatsWithAlgorithm(
+                          Ib.view(np.uint8), 4 if conn == 1 else 8, cv2.CV_32S,
+                          cv2.CCL_WU)
+  nl  -= 1
+  area = stats[1:, cv2.CC_STAT_AREA].astype(np.int64)
+  cpt  = cents[1:].T.copy()
+
+  order = rasterOrder(Il, nl, stats[1:, cv2.CC_STAT_TOP])
+  if order is not None:
+    area, cpt = area[order], cpt[:,order]
+    remap = np.zeros(nl+1, dtype=Il.dtype)
+    remap[order+1] = np.arange(1, nl+1, dtype=Il.dtype)
+    Il = remap[Il]
+
+  return Il, nl, area, cpt
+
+#============================== labelScipy =============================
+#
+# @brief  Components from scipy.ndimage label and center_of_mass.
+#
+def labelScipy(Ib, conn, withCentroids = True):
+
+  import scipy.ndimage as ndi
+
+  Il, nl = ndi.label(Ib, ndi.generate_binary_structure(2, conn))
+  area   = labelAreas(Il, nl, Ib)
+
+  cpt = None
+  if withCentroids:
+    index = np.arange(1, nl+1)
+    cpt   = np.array(ndi.center_of_mass(Ib, Il, index)).reshape(-1,2).T[::-1]
+
+  return Il, nl, area, cpt
+
+
+#============================= labelStrips =============================
+#
+# @brief  Components labeled in parallel over horizontal strips.
+#
+# Each strip is labeled (by a serial backend) on a thread pool, since the
+# labeling kernels release the GIL, along with its per-label moments.
+# Labels of the strips that touch across the boundary rows are then merged
+# (see _equivalences), the moments reduced per component, and the strip
+# label images renumbered to the final labels, again in parallel.
+# Results equal those of the serial backends (same labels, in raster
+# order).
+#
+# @param[in]  Ib        Binary mask.
+# @param[in]  conn      Connectivity (1: 4-connected, 2: 8-connected).
+# @param[in]  withCentroids Also compute the centroids.
+# @param[in]  backend   Backend labeling the strips (see BACKENDS).
+# @param[in]  nStrip    Number of strips (default: number of workers).
+# @param[in]  executor  Thread pool executor (default: a shared one, with
+#                       one worker per core).
+#
+def labelStrips(Ib, conn, withCentroids = True, backend = 'skimage',
+                          nStrip = None, executor = None):
+
+  if nStrip is None:
+    nStrip = os.cpu_count() or 1
+
+  nStrip = max(1, min(nStrip, Ib.shape[0] // 16))
+  if nStrip == 1:
+    return BACKENDS[backend](Ib, conn, withCentroids)
+
+  if executor is None:
+    executor = stripPool()
+
+  rBound = np.linspace(0, Ib.shape[0], nStrip + 1).astype(int)
+
+  def labelStrip(k):
+    rs, re = rBound[k], rBound[k+1]
+    Is = Ib[rs:re]
+    Il, nl, area, _ = BACKENDS[backend](Is, conn, False)
+
+    sums = None
+    if withCentroids:
+      labs, rows, cols = _labelPixels(Il, Is)
+      sums    = np.empty((2, nl))
+      sums[0] = np.bincount(labs, weights=cols, minlength=nl+1)[1:]
+      sums[1] = np.bincount(labs, weights=rows + rs, minlength=nl+1)[1:]
+
+    return Il, nl, area, sums
+
+  parts = list(executor.map(labelStrip, range(nStrip)))
+
+  # Strip label -> node index (offset + label), and boundary row pairs.
+  counts = np.array([part[1] for part in parts])
+  offset = np.cumsum(counts) - counts - 1
+
+  pairs = []
+  for k in range(nStrip - 1):
+    a = parts[k][0][-1].astype(np.int64)
+    b = parts[k+1][0][0].astype(np.int64)
+    pk = [(a, b)]
+    if conn != 1:
+      pk += [(a[:-1], b[1:]), (a[1:], b[:-1])]
+    for ak, bk in pk:
+      isOn = (ak > 0) & (bk > 0)
+      pairs.append(np.stack((ak[isOn] + offset[k], bk[isOn] + offset[k+1])))
+
+  # Strips are labeled in raster order, so the nodes are too (by strip,
+  # then label), hence a component's first node gives its raster order.
+  nNode = np.sum(counts)
+  nl, comp = _equivalences(nNode, np.concatenate(pairs, axis=1), np.arange(nNode))
+
+  area = np.bincount(comp, weights=np.concatenate([part[2] for part in parts]),
+                     minlength=nl).astype(np.int64)
+
+  cpt = None
+  if withCentroids:
+    sums = np.concatenate([part[3] for part in parts], axis=1)
+    cpt  = np.empty((2, nl))
+    cpt[0] = np.bincount(comp, weights=sums[0], minlength=nl) / area
+    cpt[1] = np.bincount(comp, weights=sums[1], minlength=nl) / area
+
+  # Final labels, per strip.
+  Il = np.empty(Ib.shape, dtype=np.int32 if nl < np.iinfo(np.int32).max else np.int64)
+
+  def relabelStrip(k):
+    lut = np.zeros(counts[k] + 1, dtype=Il.dtype)
+    lut[1:] = comp[offset[k]+1 : offset[k]+1+counts[k]] + 1
+    if np.array_equal(lut, np.arange(counts[k] + 1)):        # E.g., first strip.
+      np.copyto(Il[rBound[k]:rBound[k+1]], parts[k][0])
+    else:
+      np.take(lut, parts[k][0], out=Il[rBound[k]:rBound[k+1]], mode='clip')
+
+  list(executor.map(relabelStrip, range(nStrip)))
+
+  return Il, nl, area, cpt
+
+#============================== stripPool ==============================
+#
+# @brief  Shared thread pool of labelStrips, one worker per core.
+#
+_stripPool = None
+
+def stripPool():
+
+  global _stripPool
+  if _stripPool is None:
+    from concurrent.futures import ThreadPoolExecutor
+    _stripPool = ThreadPoolExecutor(max_workers = os.cpu_count() or 1)
+
+  return _stripPool
+
+## Backends by name.
+BACKENDS = dict(skimage = labelSkimage, cv2 = labelCv2, scipy = labelScipy,
+                parallel = labelStrips)
+
+
+#============================= _equivalences ===========================
+#
+# @brief  Components of equivalent labels, numbered in raster order.
+#
+# The equivalence classes of the (label) nodes under the given pairs are
+# their connected components, found by union-find over the sparse pair
+# graph.  They are numbered by their first pixel.
+#
+# @param[in]  nNode     Number of nodes.
+# @param[in]  pairs     Equivalent node pairs (2 x P).
+# @param[in]  first     Raster order key of each node (e.g., the raster
+#                       index of its first pixel).
+#
+# @param[out] nComp     Number of components.
+# @param[out] comp      Component of each node (0 to nComp-1).
+#
+def _equivalences(nNode, pairs, first):
+
+  from scipy.sparse import coo_matrix
+  from scipy.sparse.csgraph import connected_components
+
+  graph = coo_matrix((np.ones(pairs.shape[1]), (pairs[0], pairs[1])),
+                     shape=(nNode, nNode))
+  nComp, comp = connected_components(graph, directed=False)
+
+  cFirst = np.full(nComp, np.iinfo(np.int64).max)
+  np.minimum.at(cFirst, comp, first)
+  order = np.empty(nComp, dtype=np.int64)
+  order[np.argsort(cFirst)] = np.arange(nComp)
+
+  return nComp, order[comp]
+
+#============================== labelStats =============================
+#
+# @brief  Areas and centroids of the labels of a label image.
+#
+# Coordinate sums are integer valued, hence exact, so the centroids equal
+# the mean pixel coordinates (as regionprops computes them).
+#
+# @param[in]  Il        Label image.
+# @param[in]  nl        Number of labels.
+# @param[in]  keep      Labels (zero based) to measure, in output order
+#                       (optional, default: all).
+# @param[in]  Ib        Foreground mask (optional, see _labelPixels).
+#
+# @param[out] area      Label areas (nl, or as keep).
+# @param[out] cpt       Label centroids (2 x nl or as keep, OpenCV x,y order).
+#
+def labelStats(Il, nl, keep = None, Ib = None):
+
+  labs, rows, cols = _labelPixels(Il, Ib)
+
+  if keep is not None:
+    labs, nl = _keepMap(nl, keep)[labs], np.size(keep)
+
+  area = np.bincount(labs, minlength=nl+1)[1:]
+  cpt  = np.empty((2, nl))
+  cpt[0] = np.bincount(labs, weights=cols, minlength=nl+1)[1:] / area
+  cpt[1] = np.bincount(labs, weights=rows, minlength=nl+1)[1:] / area
+
+  return area.astype(np.int64), cpt
+
+#============================== labelAreas =============================
+#
+# @brief  Areas of the labels of a label image.
+#
+def labelAreas(Il, nl, Ib = None):
+
+  labs = _labelPixels(Il, Ib, False)
+
+  return np.bincount(labs, minlength=nl+1)[1:].astype(np.int64)
+
+#============================== _labelPixels ===========================
+#
+# @brief  Labels and coordinates of the labeled pixels, in raster order.
+#
+# Finding the pixels is faster from the binary foreground mask than from
+# the label image.  The mask can be a superset of the labeled pixels (as
+# after selecting labels): the extra pixels get label 0, whose statistics
+# are discarded by the callers.
+#
+# @param[in]  Il        Label image.
+# @param[in]  Ib        Foreground mask (optional).
+# @param[in]  withCoords  Also return the pixel rows and columns.
+#
+def _labelPixels(Il, Ib = None, withCoords = True):
+
+  pix  = np.flatnonzero(Il if Ib is None else Ib)
+  if not withCoords:
+    return Il.ravel()[pix]
+
+  rows, cols = np.divmod(pix, Il.shape[1])
+
+  return Il.ravel()[pix], rows, cols
+
+
+## Region table columns, as structured dtype fields.  Centroids are in
+## OpenCV (x,y) order, bounding boxes are (min row, min col, max row, max
+## col) with exclusive max (as regionprops), and orientation is that of
+## regionprops (major axis angle to the row axis, in [-pi/2, pi/2]).  For
+## regions with the major axis along the columns, the orientation is always
+## pi/2, where regionprops may give -pi/2 from rounding noise.
+COLUMNS = dict(label         = ('label', np.int64),
+               area          = ('area', np.int64),
+               centroid      = ('centroid', np.float64, (2,)),
+               bbox          = ('bbox', np.int64, (4,)),
+               orientation   = ('orientation', np.float64),
+               meanIntensity = ('meanIntensity', np.float64))
+
+#============================== regionTable ============================
+#
+# @brief  Table of region properties, one row per label.
+#
+# Only the requested columns are computed, each by vectorized per-label
+# reductions over the labeled pixels.  Areas and centroids, if already
+# known (e.g., from labelRegions), can be given to skip their computation.
+# A subset of the labels can be tabulated, without relabeling the image,
+# in which case the rows (and label column) follow the subset order.
+#
+# @param[in]  Il        Label image (labels 1 to nl).
+# @param[in]  nl        Number of labels.
+# @param[in]  columns   Column names (see COLUMNS).
+# @param[in]  intensity Intensity image, for 'meanIntensity' (H x W, or
+#                       H x W x C for per-channel means).
+# @param[in]  area      Label areas, of the table rows (optional).
+# @param[in]  cpt       Label centroids, of the table rows (optional).
+# @param[in]  Ib        Foreground mask (optional, see _labelPixels).
+# @param[in]  keep      Labels (zero based) to tabulate (optional).
+#
+# @param[out] table     Structured array, one row per (kept) label, with
+#                       the requested columns.
+#
+def regionTable(Il, nl, columns = ('label', 'area', 'centroid'),
+                        intensity = None, area = None, cpt = None, Ib = None,
+                        keep = None):
+
+  if 'meanIntensity' in columns and np.shape(intensity)[:2] != np.shape(Il):
+    raise ValueError('meanIntensity needs an intensity image of the label image size.')
+
+  fields = []
+  for name in columns:
+    field = COLUMNS[name]
+    if name == 'meanIntensity' and np.ndim(intensity) == 3:
+      field = (field[0], field[1], (np.shape(intensity)[2],))
+    fields.append(field)
+
+  nlAll = nl
+  if keep is not None:
+    nl = np.size(keep)
+
+  table = np.zeros(nl, dtype=fields)
+  if 'label' in columns:
+    table['label'] = np.arange(1, nl+1)
+
+  if (set(columns) == {'label'}) or nl == 0:
+    return table
+
+  needsCpt = ('centroid' in columns and cpt is None) or 'orientation' in columns
+  needsPix = needsCpt or (area is None) or \
+             not set(columns).isdisjoint(('bbox', 'orientation', 'meanIntensity'))
+  if needsPix:
+    labs, rows, cols = _labelPixels(Il, Ib)
+    if keep is not None:
+      labs = _keepMap(nlAll, keep)[labs]
+
+  if area is None:
+    area = np.bincount(labs, minlength=nl+1)[1:]
+  if 'area' in columns:
+    table['area'] = area
+
+  if needsCpt and cpt is None:
+    cpt = np.empty((2, nl))
+    cpt[0] = np.bincount(labs, weights=cols, minlength=nl+1)[1:] / area
+    cpt[1] = np.bincount(labs, weights=rows, minlength=nl+1)[1:] / area
+  if 'centroid' in columns:
+    table['centroid'] = cpt.T
+
+  if 'bbox' in columns:
+    table['bbox'] = _labelBoxes(labs, rows, cols, nl)
+
+  if 'orientation' in columns:
+    dr   = rows - cpt[1][labs-1]
+    dc   = cols - cpt[0][labs-1]
+    mu20 = np.bincount(labs, weights=dr*dr, minlength=nl+1)[1:]
+    mu02 = np.bincount(labs, weights=dc*dc, minlength=nl+1)[1:]
+    mu11 = np.bincount(labs, weights=dr*dc, minlength=nl+1)[1:]
+
+    # Rounding noise in mu11 would pick the sign of a +-pi/2 orientation
+    # (axis along the columns), so snap it to zero to get pi/2, the value
+    # regionprops gives for mirror symmetric regions with exact moments.
+    mu11 = np.where(np.abs(mu11) <= 1e-10 * (mu20 + mu02), 0.0, mu11)
+    table['orientation'] = np.where(mu20 == mu02,
+                                    np.where(mu11 > 0, np.pi/4, -np.pi/4),
+                                    0.5 * np.arctan2(2*mu11, mu20 - mu02))
+
+  if 'meanIntensity' in columns:
+    vals = np.reshape(intensity, (Il.size, -1))[rows * Il.shape[1] + cols]
+    for ci in range(vals.shape[1]):
+      mean = np.bincount(labs, weights=vals[:,ci], minlength=nl+1)[1:] / area
+      if np.ndim(intensity) == 3:
+        table['meanIntensity'][:,ci] = mean
+      else:
+        table['meanIntensity'] = mean
+
+  return table
+
+#============================= _labelBoxes =============================
+#
+# @brief  Bounding boxes (as the region table) of labeled pixels.
+#
+def _labelBoxes(labs, rows, cols, nl):
+
+  bbox = np.empty((nl+1, 4), dtype=np.int64)
+  bbox[:,:2] = np.iinfo(np.int64).max
+  bbox[:,2:] = -1
+  np.minimum.at(bbox[:,0], labs, rows)
+  np.minimum.at(bbox[:,1], labs, cols)
+  np.maximum.at(bbox[:,2], labs, rows)
+  np.maximum.at(bbox[:,3], labs, cols)
+  bbox[:,2:] += 1
+
+  return bbox[1:]
+
+#============================= labelRegions ============================
+#
+# @brief  Label the components of a binary mask and measure them.
+#
+# @param[in]  Ib            Binary mask (bool).
+# @param[in]  conn          Connectivity (1: 4-connected, 2: 8-connected).
+# @param[in]  backend       Backend name (see BACKENDS).
+# @param[in]  withCentroids If False, centroids are only returned by the
+#                           backends that get them for free (else None).
+#
+# @param[out] Il        Label image (0 is background).
+# @param[out] nl        Number of components.
+# @param[out] area      Component areas (nl).
+# @param[out] cpt       Component centroids (2 x nl, OpenCV x,y order).
+#
+def labelRegions(Ib, conn = 1, backend = 'skimage', withCentroids = True):
+
+  return BACKENDS[backend](Ib, conn, withCentroids)
+
+#============================= mergeWindows ============================
+#
+# @brief  Merge overlapping (or abutting) windows into their bounding boxes.
+#
+# Merging repeats until no two windows overlap, since a merged window can
+# reach windows that neither of its parts did.
+#
+# @param[in]  wins      Windows (K x 4), as half-open (r0, r1, c0, c1).
+#
+# @param[out] wins      Disjoint windows (at most K, in no particular order).
+#
+def mergeWindows(wins):
+
+  from scipy.sparse.csgraph import connected_components
+
+  wins = np.array(wins, dtype=np.int64).reshape(-1,4)
+  while len(wins) > 1:
+    r0, r1, c0, c1 = (wins[:,ii] for ii in range(4))
+    isNear = (r0[:,None] <= r1[None,:]) & (r0[None,:] <= r1[:,None]) \
+           & (c0[:,None] <= c1[None,:]) & (c0[None,:] <= c1[:,None])
+
+    nGroup, group = connected_components(isNear, directed=False)
+    if nGroup == len(wins):
+      break
+
+    merged = np.empty((nGroup, 4), dtype=np.int64)
+    merged[:,0::2] = np.iinfo(np.int64).max
+    merged[:,1::2] = np.iinfo(np.int64).min
+    for ii in range(4):
+      ufunc = np.minimum if ii % 2 == 0 else np.maximum
+      ufunc.at(merged[:,ii], group, wins[:,ii])
+    wins = merged
+
+  return wins
+
+#============================= labelWindows ============================
+#
+# @brief  Connected components of a mask found within windows only.
+#
+# The windows are clipped to the image and merged (see mergeWindows), then
+# each is labeled on its own.  If the foreground touches an interior side
+# of a window (one that is not an image border), a component could be cut,
+# so that window grows by half its size on each side, and the windows are
+# merged and labeled again.  Hence each component found is whole, and the
+# results equal those of labeling the full image, for the components that
+# meet the windows.  The cost is that of the area the windows cover.
+#
+# @param[in]  Ib        Binary mask (bool, or nonzero is foreground).
+# @param[in]  wins      Windows (K x 4), as half-open (r0, r1, c0, c1).
+# @param[in]  conn      Connectivity (1: 4-connected, 2: 8-connected).
+# @param[in]  backend   Connected components backend name (see BACKENDS).
+#
+# @param[out] area      Component areas (N).
+# @param[out] cpt       Component centroids (2 x N, OpenCV x,y order).
+# @param[out] bbox      Component bounding boxes (N x 4, as the region table).
+# @param[out] wins      The final (disjoint) windows.
+#
+# Components come in raster order of their first pixel, as for full image
+# labeling.
+#
+def labelWindows(Ib, wins, conn = 1, backend = 'skimage'):
+
+  imsize = np.array(np.shape(Ib)[:2])
+  wins   = np.array(wins, dtype=np.int64).reshape(-1,4)
+  wins[:,0:2] = np.clip(wins[:,0:2], 0, imsize[0])
+  wins[:,2:4] = np.clip(wins[:,2:4], 0, imsize[1])
+  wins   = mergeWindows(wins[(wins[:,0] < wins[:,1]) & (wins[:,2] < wins[:,3])])
+
+  isCut = True
+  while isCut:
+    isCut = False
+    found = []
+    for ii, (r0, r1, c0, c1) in enumerate(wins):
+      Iw = Ib[r0:r1, c0:c1]
+      if Iw.dtype != bool:
+        Iw = Iw != 0
+
+      if (r0 > 0 and Iw[0].any()) or (r1 < imsize[0] and Iw[-1].any()) \
+          or (c0 > 0 and Iw[:,0].any()) or (c1 < imsize[1] and Iw[:,-1].any()):
+        dr, dc = (r1 - r0 + 1) // 2, (c1 - c0 + 1) // 2
+        wins[ii] = (max(r0 - dr, 0), min(r1 + dr, imsize[0]),
+                    max(c0 - dc, 0), min(c1 + dc, imsize[1]))
+        isCut = True
+        continue
+
+      if not isCut:
+        found.append(_windowRegions(Iw, (r0, c0), imsize[1], conn, backend))
+
+    if isCut:
+      wins = mergeWindows(wins)
+
+  if len(found) == 0:
+    return np.zeros(0, dtype=np.int64), np.zeros((2,0)), \
+           np.zeros((0,4), dtype=np.int64), wins
+
+  area  = np.concatenate([f[0] for f in found])
+  cpt   = np.concatenate([f[1] for f in found], axis=1)
+  bbox  = np.concatenate([f[2] for f in found])
+  order = np.argsort(np.concatenate([f[3] for f in found]))
+
+  return area[order], cpt[:,order], bbox[order], wins
+
+#============================ _windowRegions ===========================
+#
+# @brief  Components of one window, in image coordinates.
+#
+# @param[out] first     Image raster index of the first pixel of each.
+#
+def _windowRegions(Iw, offset, width, conn, backend):
+
+  Il, nl, area, cpt = labelRegions(Iw, conn, backend)
+
+  labs, rows, cols = _labelPixels(Il, Iw)
+  rows = rows + offset[0]
+  cols = cols + offset[1]
+
+  first = np.empty(nl+1, dtype=np.int64)
+  first[labs[::-1]] = (rows * width + cols)[::-1]     # Last write wins.
+
+  cpt = cpt + np.array([[offset[1]], [offset[0]]])
+
+  return area, cpt, _labelBoxes(labs, rows, cols, nl), first[1:]
+
+#============================= bandRegions =============================
+#
+# @brief  Connected components of a mask streamed in row bands.
+#
+# For masks that do not fit in memory (e.g., memory mapped mosaics), only
+# one band of rows is read and labeled at a time.  Components still open
+# at the last row of a band are carried over, as accumulated moments plus
+# their labels along that row, and merged with the band labels they touch
+# in the next band.  A component that does not reach the last row of its
+# band is closed, and is output with that band.  Memory is that of a band,
+# plus the open components (at most one per column).
+#
+# Each component has a key, the index of its first band label over the
+# stream, which orders the components as full image labeling does (raster
+# order of their first pixels).
+#
+# @param[in]  I         Mask (H x W array, nonzero is foreground), e.g., a
+#                       np.memmap.
+# @param[in]  band      Number of rows per band.
+# @param[in]  conn      Connectivity (1: 4-connected, 2: 8-connected).
+# @param[in]  backend   Backend labeling the bands (see BACKENDS).
+# @param[in]  prep      Function applied to each band before thresholding
+#                       (optional, must be pointwise).
+#
+# @param[out] area      Areas of the components closed in a band (yield).
+# @param[out] cpt       Their centroids (2 x N, OpenCV x,y order).
+# @param[out] key       Their raster order keys (increasing).
+#
+def bandRegions(I, band = 1024, conn = 1, backend = 'skimage', prep = None):
+
+  nRows = np.shape(I)[0]
+
+  # Open components: moments (area, column sum, row sum), keys, and their
+  # index (plus one) along the last row read.
+  openMom = np.zeros((3,0))
+  openKey = np.zeros(0, dtype=np.int64)
+  openRow = None
+  nSeen   = 0                               # Band labels so far.
+
+  for rs in range(0, nRows, band):
+    Ib = I[rs:rs+band]
+    if prep is not None:
+      Ib = prep(Ib)
+    Ib = np.asarray(Ib)
+    if Ib.dtype != bool:
+      Ib = Ib != 0
+
+    Il, nl, area, _ = BACKENDS[backend](Ib, conn, False)
+    labs, rows, cols = _labelPixels(Il, Ib)
+
+    # Nodes: the open components, then the band labels.
+    nOpen = len(openKey)
+    mom   = np.empty((3, nOpen + nl))
+    mom[:,:nOpen] = openMom
+    mom[0,nOpen:] = area
+    mom[1,nOpen:] = np.bincount(labs, weights=cols, minlength=nl+1)[1:]
+    mom[2,nOpen:] = np.bincount(labs, weights=rows + rs, minlength=nl+1)[1:]
+    key = np.concatenate((openKey, nSeen + np.arange(nl)))
+    nSeen += nl
+
+    pairs = [np.zeros((2,0), dtype=np.int64)]
+    if openRow is not None:
+      a, b = openRow, Il[0].astype(np.int64)
+      for ak, bk in [(a, b)] + ([(a[:-1], b[1:]), (a[1:], b[:-1])] if conn != 1 else []):
+        isOn = (ak > 0) & (bk > 0)
+        pairs.append(np.stack((ak[isOn] - 1, bk[isOn] - 1 + nOpen)))
+
+    if nOpen + nl == 0:
+      openRow = None
+      yield np.zeros(0, dtype=np.int64), np.zeros((2,0)), np.zeros(0, dtype=np.int64)
+      continue
+
+    nComp, comp = _equivalences(nOpen + nl, np.concatenate(pairs, axis=1), key)
+
+    cMom = np.empty((3, nComp))
+    for ii in range(3):
+      cMom[ii] = np.bincount(comp, weights=mom[ii], minlength=nComp)
+    cKey = np.full(nComp, np.iinfo(np.int64).max)
+    np.minimum.at(cKey, comp, key)
+
+    # Components reaching the last row stay open (unless it is the last).
+    isOpen = np.zeros(nComp, dtype=bool)
+    if rs + band < nRows:
+      lastRow = Il[-1].astype(np.int64)
+      isLast  = lastRow > 0
+      isOpen[comp[lastRow[isLast] - 1 + nOpen]] = True
+
+    isDone = ~isOpen
+    yield cMom[0,isDone].astype(np.int64), cMom[1:,isDone] / cMom[0,isDone], cKey[isDone]
+
+    openMom = cMom[:,isOpen]
+    openKey = cKey[isOpen]
+    if rs + band < nRows:
+      openRow = np.zeros(len(lastRow), dtype=np.int64)
+      openRow[isLast] = np.cumsum(isOpen)[comp[lastRow[isLast] - 1 + nOpen]]
+
+#
+#---------------------------------------------------------------------------
+#=============================== tileLabeler ===============================
+#---------------------------------------------------------------------------
+#
+
+class tileLabeler(object):
+  '''!
+  @brief  Incremental connected components of a mostly static mask.
+
+  The image is split into tiles, each labeled on its own.  A tile is
+  relabeled only when its pixels differ from those of the last update
+  (an exact comparison against the stored mask, so no fingerprint
+  collisions).  Tile components that touch across tile seams are
+  equivalent; the equivalence pairs of each seam are kept and recomputed
+  only for seams next to a changed tile.  Components are the connected
+  groups of tile components, with their areas, coordinate sums (integer
+  valued, hence exact) and first pixels merged from the tile ones.
+
+  Results equal labelRegions + labelStats on the full image, in the same
+  raster order.  Per update cost is a comparison pass over the mask, plus
+  labeling the changed tiles, plus merging the (tile) components.
+
+  Usage::
+
+    tiler = tileLabeler(tile = 64, conn = 1)
+    for Ib in masks:
+      area, cpt, bbox = tiler.update(Ib)
+  '''
+
+  #============================ tileLabeler ==========================
+  #
+  # @brief  Constructor.
+  #
+  # @param[in]  tile      Tile size (pixels).
+  # @param[in]  conn      Connectivity (1: 4-connected, 2: 8-connected).
+  # @param[in]  backend   Connected components backend name (see BACKENDS).
+  #
+  def __init__(self, tile = 64, conn = 1, backend = 'skimage'):
+
+    self.tile    = tile
+    self.conn    = conn
+    self.backend = backend
+    self.reset()
+
+  #=============================== reset =============================
+  #
+  # @brief  Forget the stored mask, so the next update labels all tiles.
+  #
+  def reset(self):
+
+    self.mask     = None
+    self.nChanged = 0
+    self.result   = None
+
+  #============================== _setup =============================
+  #
+  # @brief  Per tile storage for a new image size.
+  #
+  def _setup(self, imsize):
+
+    T = self.tile
+    self.imsize = imsize
+    self.rStart = np.arange(0, imsize[0], T)
+    self.cStart = np.arange(0, imsize[1], T)
+    nR, nC = len(self.rStart), len(self.cStart)
+
+    # Tile component ids are tile index * cap + local label, so that they
+    # do not depend on the other tiles.  A tile has at most cap - 1 labels.
+    self.cap = (T * T + 1) // 2 + 1
+    idType   = np.int32 if nR * nC * self.cap < np.iinfo(np.int32).max else np.int64
+
+    self.mask = np.zeros(imsize, dtype=bool)
+    self.ids  = np.zeros(imsize, dtype=idType)
+
+    # Per tile: component stats (one row each: area, column sum, row sum,
+    # first pixel, bounding box), and the equivalence pairs of the seams
+    # to its right and below (and of its lower right corner).
+    self.stats  = [np.zeros((0,8))] * (nR * nC)
+    self.counts = np.zeros(nR * nC, dtype=np.int64)
+    self.seams  = [np.zeros((2,0), dtype=np.int64)] * (nR * nC)
+
+  #============================== update =============================
+  #
+  # @brief  Components of a new mask.
+  #
+  # @param[in]  Ib        Binary mask (bool).
+  #
+  # @param[out] area      Component areas (N).
+  # @param[out] cpt       Component centroids (2 x N, OpenCV x,y order).
+  # @param[out] bbox      Component bounding boxes (N x 4, as the region table).
+  #
+  def update(self, Ib):
+
+    if self.mask is None or self.mask.shape != Ib.shape:
+      self._setup(Ib.shape)
+      changed = np.ones((len(self.rStart), len(self.cStart)), dtype=bool)
+    else:
+      changed = self._changedTiles(Ib)
+
+    self.nChanged = np.count_nonzero(changed)
+    if self.nChanged == 0 and self.result is not None:
+      return self.result
+
+    T, nC = self.tile, len(self.cStart)
+    for ti, tj in zip(*np.nonzero(changed)):
+      rs, cs = ti * T, tj * T
+      self.mask[rs:rs+T, cs:cs+T] = Ib[rs:rs+T, cs:cs+T]
+      self.stats[ti * nC + tj] = self._labelTile(ti * nC + tj, rs, cs)
+      self.counts[ti * nC + tj] = len(self.stats[ti * nC + tj])
+
+    # Seams of a tile change with it, or with its right, lower or lower
+    # right neighbors.
+    near = changed.copy()
+    near[:,:-1]   |= changed[:,1:]
+    near[:-1,:]   |= changed[1:,:]
+    near[:-1,:-1] |= changed[1:,1:]
+    for ti, tj in zip(*np.nonzero(near)):
+      self.seams[ti * nC + tj] = self._seamPairs(ti, tj)
+
+    self.result = self._merge()
+    return self.result
+
+  #=========================== _changedTiles =========================
+  #
+  # @brief  Flags of the tiles that differ from the stored mask.
+  #
+  # Compared a band of tile rows at a time, to keep temporaries small.
+  #
+  def _changedTiles(self, Ib):
+
+    T = self.tile
+    changed = np.empty((len(self.rStart), len(self.cStart)), dtype=bool)
+    for ti, rs in enumerate(self.rStart):
+      colDiff = np.not_equal(Ib[rs:rs+T], self.mask[rs:rs+T]).any(axis=0)
+      changed[ti] = np.logical_or.reduceat(colDiff, self.cStart)
+
+    return changed
+
+  #============================ _labelTile ===========================
+  #
+  # @brief  Label one tile, store its component ids, and get their stats.
+  #
+  def _labelTile(self, tIndex, rs, cs):
+
+    T  = self.tile
+    Iw = self.mask[rs:rs+T, cs:cs+T]
+    Il, nl, area, _ = labelRegions(Iw, self.conn, self.backend, False)
+
+    self.ids[rs:rs+T, cs:cs+T] = np.where(Il > 0, tIndex * self.cap + Il, 0)
+
+    stats = np.empty((nl, 8))
+    if nl == 0:
+      return stats
+
+    labs, rows, cols = _labelPixels(Il, Iw)
+    rows = rows + rs
+    cols = cols + cs
+
+    first = np.empty(nl+1, dtype=np.int64)
+    first[labs[::-1]] = (rows * self.imsize[1] + cols)[::-1]  # Last write wins.
+
+    stats[:,0]  = area
+    stats[:,1]  = np.bincount(labs, weights=cols, minlength=nl+1)[1:]
+    stats[:,2]  = np.bincount(labs, weights=rows, minlength=nl+1)[1:]
+    stats[:,3]  = first[1:]
+    stats[:,4:] = _labelBoxes(labs, rows, cols, nl)
+
+    return stats
+
+  #============================ _seamPairs ===========================
+  #
+  # @brief  Equivalent tile component ids across the seams of a tile.
+  #
+  # The seams are those to the right of and below the tile, plus the
+  # diagonal pairs of its lower right corner if 8-connected.
+  #
+  def _seamPairs(self, ti, tj):
+
+    T, ids = self.tile, self.ids
+    r, c   = (ti + 1) * T, (tj + 1) * T
+    isDiag = self.conn != 1
+
+    pairs = []
+    if c < self.imsize[1]:
+      pairs.append((ids[ti*T:r, c-1], ids[ti*T:r, c]))
+    if r < self.imsize[0]:
+      pairs.append((ids[r-1, tj*T:c], ids[r, tj*T:c]))
+    if isDiag:
+      pairs += [(a[:-1], b[1:]) for a, b in pairs] + [(a[1:], b[:-1]) for a, b in pairs]
+      if r < self.imsize[0] and c < self.imsize[1]:
+        pairs.append((ids[[r-1, r-1], [c-1, c]], ids[[r, r], [c, c-1]]))
+
+    if len(pairs) == 0:
+      return np.zeros((2,0), dtype=np.int64)
+
+    pairs = np.concatenate([np.stack(ab) for ab in pairs], axis=1)
+    return pairs[:, (pairs[0] > 0) & (pairs[1] > 0)].astype(np.int64)
+
+  #============================== _merge =============================
+  #
+  # @brief  Merge the equivalent tile components, in raster order.
+  #
+  def _merge(self):
+
+    stats = np.concatenate(self.stats)
+    nNode = len(stats)
+    if nNode == 0:
+      return np.zeros(0, dtype=np.int64), np.zeros((2,0)), np.zeros((0,4), dtype=np.int64)
+
+    # Tile component id -> row of the concatenated stats.
+    offset = np.cumsum(self.counts) - self.counts - 1
+
+    pairs = np.concatenate(self.seams, axis=1)
+    pairs = offset[pairs // self.cap] + pairs % self.cap
+
+    nComp, comp = _equivalences(nNode, pairs, stats[:,3].astype(np.int64))
+
+    area = np.bincount(comp, weights=stats[:,0], minlength=nComp)
+    cpt  = np.empty((2, nComp))
+    cpt[0] = np.bincount(comp, weights=stats[:,1], minlength=nComp) / area
+    cpt[1] = np.bincount(comp, weights=stats[:,2], minlength=nComp) / area
+
+    bbox = np.empty((nComp, 4))
+    bbox[:,:2] = np.inf
+    bbox[:,2:] = -np.inf
+    for ii in range(4):
+      (np.minimum if ii < 2 else np.maximum).at(bbox[:,ii], comp, stats[:,4+ii])
+
+    return area.astype(np.int64), cpt, bbox.astype(np.int64)
+
+#================================ relabel ==============================
+#
+# @brief  Keep only the given labels, renumbered in the given order.
+#
+# @param[in]  Il        Label image.
+# @param[in]  nl        Number of labels.
+# @param[in]  keep      Labels to keep (zero based), in their new order.
+#
+# @param[out] Il        Label image with keep[k] relabeled as k+1.
+#
+def relabel(Il, nl, keep):
+
+  return _keepMap(nl, keep, Il.dtype)[Il]
+
+#================================ _keepMap =============================
+#
+# @brief  Label map sending keep[k] to k+1, and the other labels to 0.
+#
+def _keepMap(nl, keep, dtype = np.int64):
+
+  remap = np.zeros(nl+1, dtype=dtype)
+  remap[keep+1] = np.arange(1, np.size(keep)+1, dtype=dtype)
+
+  return remap
+
+#================================ largest ==============================
+#
+# @brief  The K largest of the flagged labels, by decreasing area.
+#
+# Selection is by partition, so linear in the number of labels.  Among
+# equal areas, labels come in raster (label) order.
+#
+# @param[in]  area      Label areas (nl).
+# @param[in]  isKept    Flags of the candidate labels (nl).
+# @param[in]  K         Number of labels to keep.
+#
+# @param[out] keep      Labels (zero based), largest first.
+#
+def largest(area, isKept, K):
+
+  keep = np.flatnonzero(isKept)
+  rank = keep - area[keep].astype(np.int64) * (np.size(area) + 1)
+  if keep.size > K:
+    best = np.argpartition(rank, K-1)[:K]
+    keep, rank = keep[best], rank[best]
+
+  return keep[np.argsort(rank)]
+
+#============================== rasterOrder ============================
+#
+# @brief  Order of the labels by first pixel, or None if already ordered.
+#
+# The first pixel of a component is on its top row, so labels sorted by
+# top row are in raster order except possibly among labels sharing a top
+# row.  Only those rows are scanned to resolve ties.
+#
+# @param[in]  Il        Label image.
+# @param[in]  nl        Number of labels.
+# @param[in]  top       Top row of each label (nl).
+#
+# @param[out] order     Labels (zero based) in raster order, or None.
+#
+def rasterOrder(Il, nl, top):
+
+  if nl < 2 or np.all(np.diff(top) > 0):
+    return None
+
+  rows = np.unique(top)
+  sub  = Il[rows]
+  nz   = np.flatnonzero(sub)
+  labs = sub.ravel()[nz] - 1
+  labs = labs[top[labs] == rows[nz // Il.shape[1]]]     # First rows only.
+
+  labs, first = np.unique(labs, return_index=True)
+  order = labs[np.argsort(first)]
+
+  if np.all(order[1:] > order[:-1]):
+    return None
+
+  return order
+
+#============================== randomBlobs ============================
+#
+# @brief  Random binary mask of square blobs, e.g., for calibration.
+#
+# @param[in]  imSize    Image size (rows, cols).
+# @param[in]  nBlobs    Number of blobs.
+# @param[in]  blobSize  Blob side length, in pixels.
+# @param[in]  seed      Random seed.
+#
+def randomBlobs(imSize, nBlobs = 10, blobSize = 16, seed = 0):
+
+  rng = np.random.default_rng(seed)
+  Ib  = np.zeros(imSize, dtype=bool)
+
+  rows = rng.integers(0, max(imSize[0] - blobSize, 1), nBlobs)
+  cols = rng.integers(0, max(imSize[1] - blobSize, 1), nBlobs)
+  for r, c in zip(rows, cols):
+    Ib[r:r+blobSize, c:c+blobSize] = True
+
+  return Ib
+
+#============================== calibrate ==============================
+#
+# @brief  Find the fastest available backend on a sample mask.
+#
+# Backends whose package is not installed are skipped.
+#
+# @param[in]  Ib        Sample binary mask, representative of the image
+#                       size and blob density (see randomBlobs).
+# @param[in]  conn      Connectivity.
+# @param[in]  repeats   Timing repeats per backend (best of).
+#
+# @param[out] best      Name of the fastest backend.
+# @param[out] times     Dictionary of backend name -> time (s).
+#
+def calibrate(Ib, conn = 1, repeats = 3):
+
+  times = dict()
+  for name, func in BACKENDS.items():
+    try:
+      func(Ib, conn)
+    except ImportError:
+      continue
+
+    tBest = np.inf
+    for ii in range(repeats):
+      t0 = time.perf_counter()
+      func(Ib, conn)
+      tBest = min(tBest, time.perf_counter() - t0)
+    times[name] = tBest
+
+  best = min(times, key=times.get)
+  return best, times
+
+#
+#=============================== components ==============================
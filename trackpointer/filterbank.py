@@ -0,0 +1,166 @@
+#=============================== filterbank ==============================
+#
+# @brief    Vectorized bank of constant velocity Kalman filters.
+#
+# Multi-target tracking needs one filter per target.  Rather than one
+# filter object per target, a filter bank stacks the states (4 x M) and
+# covariances (4 x 4 x M) of all targets, and runs the prediction and
+# correction as batched matrix operations, so that its per-frame cost
+# barely depends on the number of targets.
+#
+#=============================== filterbank ==============================
+
+#
+# @file     filterbank.py
+#
+# @date     2026/10/17  [created]
+#
+#!NOTE:
+#!  set indent to 2 spaces.
+#!  do not indent function code.
+#!  set tab to 4 spaces with conversion to spaces.
+#
+#=============================== filterbank ==============================
+
+import numpy as np
+
+
+#
+#---------------------------------------------------------------------------
+#================================= cvBank ==================================
+#---------------------------------------------------------------------------
+#
+
+class cvBank(object):
+  '''!
+  @brief  Bank of constant velocity Kalman filters on image positions.
+
+  Each target state is (x, y, vx, vy), in pixels and pixels per frame
+  step, with position measurements.  The process noise is that of a white
+  noise acceleration.  New targets start at their first measurement with
+  zero velocity, and a velocity variance of ``velVar``.
+
+  The states (``x``, 4 x M) and covariances (``P``, 4 x 4 x M) stack the
+  targets along the last axis, like the 2 x N track points, so that each
+  filter operation is a few elementwise operations over target rows.
+  '''
+
+  #============================== cvBank =============================
+  #
+  # @brief  Constructor.
+  #
+  # @param[in]  procNoise   Acceleration noise variance (pixels^2/step^4).
+  # @param[in]  measNoise   Position measurement noise variance (pixels^2).
+  # @param[in]  velVar      Initial velocity variance (pixels^2/step^2).
+  # @param[in]  dt          Time step (frames).
+  #
+  def __init__(self, procNoise = 1.0, measNoise = 1.0, velVar = 100.0, dt = 1.0):
+
+    self.F = np.eye(4)
+    self.F[0,2] = self.F[1,3] = dt
+
+    qa = np.array([[dt**4/4, dt**3/2], [dt**3/2, dt**2]]) * procNoise
+    self.Q = np.kron(qa, np.eye(2))           # Order (x, y, vx, vy).
+    self.R = np.eye(2) * measNoise
+
+    self.P0 = np.diag([measNoise, measNoise, velVar, velVar])
+    self.reset()
+
+  #=============================== reset =============================
+  #
+  # @brief  Remove all targets.
+  #
+  def reset(self):
+
+    self.x = np.zeros((4,0))
+    self.P = np.zeros((4,4,0))
+
+  #============================= position ============================
+  #
+  # @brief  Target positions (2 x M).
+  #
+  def position(self):
+
+    return self.x[:2].copy()
+
+  #============================= velocity ============================
+  #
+  # @brief  Target velocities (2 x M), in pixels per step.
+  #
+  def velocity(self):
+
+    return self.x[2:].copy()
+
+  #============================== predict ============================
+  #
+  # @brief  Predict all targets one step ahead.
+  #
+  def predict(self):
+
+    # Both products with F are single matrix products over all targets,
+    # where F (F P)' = F P F' since the result is symmetric.
+    nTarg = self.x.shape[1]
+    FP    = (self.F @ self.P.reshape(4,-1)).reshape(4,4,nTarg)
+
+    self.x = self.F @ self.x
+    self.P = (self.F @ FP.transpose(1,0,2).reshape(4,-1)).reshape(4,4,nTarg)
+    self.P += self.Q[:,:,None]
+
+  #============================== correct ============================
+  #
+  # @brief  Correct the given targets with their position measurements.
+  #
+  # @param[in]  idx     Target indices (K).
+  # @param[in]  z       Position measurements (2 x K).
+  #
+  def correct(self, idx, z):
+
+    if np.size(idx) == 0:
+      return
+
+    P  = self.P[:,:,idx]
+    Ph = P[:,:2]                                        # P H', 4 x 2 x K.
+
+    # Closed form inverse of the 2 x 2 innovation covariances.
+    s00 = Ph[0,0] + self.R[0,0]
+    s01 = Ph[0,1] + self.R[0,1]
+    s10 = Ph[1,0] + self.R[1,0]
+    s11 = Ph[1,1] + self.R[1,1]
+    det = s00*s11 - s01*s10
+
+    # Gains K = P H' S^-1, 4 x 2 x K.
+    K = np.empty_like(Ph)
+    K[:,0] = (Ph[:,0]*s11 - Ph[:,1]*s10) / det
+    K[:,1] = (Ph[:,1]*s00 - Ph[:,0]*s01) / det
+
+    innov = z - self.x[:2,idx]
+    self.x[:,idx] += K[:,0]*innov[0] + K[:,1]*innov[1]
+    self.P[:,:,idx] = P - K[:,None,0]*P[None,0] - K[:,None,1]*P[None,1]
+
+  #================================ add ==============================
+  #
+  # @brief  Add targets at the given positions, with zero velocity.
+  #
+  # @param[in]  z       Positions (2 x K).
+  #
+  def add(self, z):
+
+    nNew = np.shape(z)[1]
+    xNew = np.zeros((4,nNew))
+    xNew[:2] = z
+
+    self.x = np.concatenate((self.x, xNew), axis=1)
+    self.P = np.concatenate((self.P, np.repeat(self.P0[:,:,None], nNew, axis=2)),
+                            axis=2)
+
+  #=============================== select ============================
+  #
+  # @brief  Keep only the flagged targets.
+  #
+  def select(self, isKept):
+
+    self.x = self.x[:,isKept]
+    self.P = self.P[:,:,isKept]
+
+#
+#=============================== filterbank ==============================
@@ -0,0 +1,235 @@
+#================================ history ================================
+#
+# @brief    Fixed memory recorder of a track point history.
+#
+# Keeps the timestamps, track points and measurement flags of a tracker
+# over a session.  The most recent samples live in an in-memory ring
+# buffer.  Older samples can spill to an append-only ``.npy`` file, which
+# is read back through a memory map.  Readers get windows of the history
+# as array views, without copying.
+#
+#================================ history ================================
+
+#
+# @file     history.py
+#
+# @date     2026/10/17  [created]
+#
+#!NOTE:
+#!  set indent to 2 spaces.
+#!  do not indent function code.
+#!  set tab to 4 spaces with conversion to spaces.
+#
+#================================ history ================================
+
+import struct
+import time
+
+import numpy as np
+
+
+#
+#---------------------------------------------------------------------------
+#============================== TrackHistory ===============================
+#---------------------------------------------------------------------------
+#
+
+class TrackHistory(object):
+  '''!
+  @brief  Ring buffer of track point samples with spill to disk.
+
+  Each sample is a record with fields ``t`` (wall clock timestamp), ``tpt``
+  (x,y track point, NaN if no measurement), ``haveMeas``, and ``tCapture``
+  (frame capture time on the tracker timer clock, NaN if not timed).  The ring is stored
+  twice over (mirrored), so that the last ``capacity`` samples are always
+  contiguous in memory.  When the ring is about to overwrite samples not
+  yet spilled, they are appended to the spill file in one block.  Without
+  a spill file, overwritten samples are lost.
+
+  With a spill file, call ``close()`` when done (or use the history as a
+  context manager), to complete the file and release its handle.
+
+  Attach to a tracker with ``tracker.attachHistory(history)``, after which
+  every ``process`` call records the resulting state (single track point
+  trackers only; centroidMulti does not support histories).
+  '''
+
+  DTYPE  = np.dtype([('t', np.float64), ('tpt', np.float64, (2,)), ('haveMeas', bool),
+                     ('tCapture', np.float64)])
+  HEADER = 192                          # Fixed .npy header size (bytes).
+
+  #=========================== TrackHistory ==========================
+  #
+  # @brief  Constructor.
+  #
+  # @param[in]  capacity    Number of samples kept in memory.
+  # @param[in]  spillFile   Path of the .npy spill file (optional).
+  #
+  def __init__(self, capacity = 4096, spillFile = None):
+
+    self.capacity = int(capacity)
+    self.ring     = np.zeros(2 * self.capacity, dtype=TrackHistory.DTYPE)
+
+    self.count    = 0                   # Samples recorded.
+    self.nSpilled = 0                   # Samples no longer only in ring.
+
+    self.spillFile = spillFile
+    self.spillData = None
+    self.fid       = None
+
+    if spillFile is not None:
+      self.fid = open(spillFile, 'w+b')
+      self._writeHeader(0)
+
+  #============================== append =============================
+  #
+  # @brief  Record a sample.
+  #
+  # @param[in]  t         Timestamp.
+  # @param[in]  tpt       Track point (any shape with 2 elements), or None.
+  # @param[in]  haveMeas  Measurement flag.
+  # @param[in]  tCapture  Capture time on the timer clock (optional).
+  #
+  def append(self, t, tpt, haveMeas, tCapture = None):
+
+    if (self.count - self.nSpilled == self.capacity):
+      self._spill()
+
+    if haveMeas:
+      tpt = np.ravel(tpt)
+    else:
+      tpt = (np.nan, np.nan)
+
+    if tCapture is None:
+      tCapture = np.nan
+
+    slot = self.count % self.capacity
+    self.ring[slot] = self.ring[slot + self.capacity] = (t, tpt, haveMeas, tCapture)
+
+    self.count += 1
+
+  #============================== record =============================
+  #
+  # @brief  Record a track state.
+  #
+  # The capture time of timed states is on the timer (perf_counter) clock,
+  # so it goes in its own field rather than in the timestamp.
+  #
+  # @param[in]  tstate    The track state (single track point).
+  # @param[in]  t         Timestamp (default: the current wall clock time).
+  #
+  def record(self, tstate, t = None):
+
+    if t is None:
+      t = time.time()
+
+    self.append(t, tstate.tpt, tstate.haveMeas, tstate.tCapture)
+
+  #============================== window =============================
+  #
+  # @brief  Samples [i0, i1) of the history.
+  #
+  # Returns a view into the ring or into the spill file memory map.  A
+  # window that straddles the two (only possible if longer than the ring)
+  # is copied.  Fields are views too, e.g., ``window(i0,i1)['tpt']``.
+  #
+  # @param[in]  i0    First sample index (negative counts from the end).
+  # @param[in]  i1    One past the last sample index (default: end).
+  #
+  def window(self, i0, i1 = None):
+
+    i0, i1, _ = slice(i0, i1).indices(self.count)
+    i1 = max(i0, i1)
+
+    if (i0 >= self.count - self.capacity):
+      base = self.count - 1 - ((self.count - 1) % self.capacity) - self.capacity
+      return self.ring[i0 - base : i1 - base]
+
+    if (self.spillData is None):
+      raise IndexError('TrackHistory: samples before ' + str(self.count - self.capacity)
+                       + ' were not kept.')
+
+    if (i1 <= self.nSpilled):
+      return self.spillData[i0:i1]
+
+    return np.concatenate((self.spillData[i0:], self.window(self.nSpilled, i1)))
+
+  #=============================== last ==============================
+  #
+  # @brief  The last n samples (at most the ring capacity, as a view).
+  #
+  def last(self, n):
+
+    return self.window(max(self.count - n, 0))
+
+  #============================== __len__ ============================
+  #
+  def __len__(self):
+
+    return self.count
+
+  #============================== flush ==============================
+  #
+  # @brief  Spill the samples still only in memory, so the file is complete.
+  #
+  def flush(self):
+
+    if (self.fid is not None) and (self.count > self.nSpilled):
+      self._spill()
+
+  #============================== close ==============================
+  #
+  # @brief  Flush and close the spill file.
+  #
+  def close(self):
+
+    self.flush()
+    if self.fid is not None:
+      self.fid.close()
+      self.fid = None
+
+  #============================= __enter__ ===========================
+  #
+  def __enter__(self):
+
+    return self
+
+  #============================= __exit__ ============================
+  #
+  # @brief  Close on leaving a ``with`` block.
+  #
+  def __exit__(self, *excInfo):
+
+    self.close()
+
+  #============================== _spill =============================
+  #
+  # @brief  Append the unspilled ring samples to the spill file.
+  #
+  def _spill(self):
+
+    if self.fid is not None:
+      self.fid.seek(0, 2)
+      self.window(self.nSpilled).tofile(self.fid)
+      self._writeHeader(self.count)
+      self.fid.flush()
+      self.spillData = np.memmap(self.fid, dtype=TrackHistory.DTYPE, mode='r',
+                                 offset=TrackHistory.HEADER, shape=(self.count,))
+
+    self.nSpilled = self.count
+
+  #=========================== _writeHeader ==========================
+  #
+  # @brief  (Re)write the fixed size .npy header for n samples.
+  #
+  def _writeHeader(self, n):
+
+    hdict  = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" \
+             % (np.lib.format.dtype_to_descr(TrackHistory.DTYPE), n)
+    header = hdict.ljust(TrackHistory.HEADER - 11) + '\n'
+
+    self.fid.seek(0)
+    self.fid.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+
+#
+#================================ history ================================
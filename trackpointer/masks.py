@@ -0,0 +1,396 @@
+#================================= masks =================================
+#
+# @brief    Compact binary mask representations accepted by the trackers.
+#
+# The trackpointers mostly need row and column counts of the foreground
+# pixels, not the pixels themselves.  The classes here provide those
+# counts straight from compact representations of a binary mask, so that
+# masks do not need to be expanded to one byte per pixel before tracking.
+#
+#   PackedMask  - Row-wise ``np.packbits`` mask (8 pixels per byte).
+#   RunMask     - Sparse mask as row runs (run-length encoded rows), which
+#                 can also be built from foreground coordinate lists.
+#
+#================================= masks =================================
+
+#
+# @file     masks.py
+#
+# @date     2026/10/17  [created]
+#
+#!NOTE:
+#!  set indent to 2 spaces.
+#!  do not indent function code.
+#!  set tab to 4 spaces with conversion to spaces.
+#
+#================================= masks =================================
+
+import numpy as np
+
+
+# Per byte lookup tables: number of set bits, and sum of set bit positions
+# (position 0 is the most significant bit, as per ``np.packbits``).
+_BYTEBITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:,None], axis=1)
+_POPCOUNT = np.sum(_BYTEBITS, axis=1).astype(np.uint8)
+_BITPOSN  = (_BYTEBITS @ np.arange(8)).astype(np.uint8)
+
+
+#
+#---------------------------------------------------------------------------
+#=============================== CompactMask ===============================
+#---------------------------------------------------------------------------
+#
+
+class CompactMask(object):
+  '''!
+  @brief  Interface of the compact binary mask types.
+
+  Trackers test for this type to use the methods below instead of dense
+  array operations.  Compact masks are binary already, so trackers do not
+  pass them through the improcessor.
+
+  shape         - Mask size (H, W).
+  unpack        - Dense boolean mask of a row range.
+  rowCounts     - Foreground pixel count of each row.
+  colMoments    - Count and column coordinate sum for a row range.
+  moments       - Zeroth and first order moments (m00, m10, m01).
+  rowNonzero    - Foreground column indices of a row.
+  '''
+  pass
+
+
+#
+#---------------------------------------------------------------------------
+#=============================== PackedMask ================================
+#---------------------------------------------------------------------------
+#
+
+class PackedMask(CompactMask):
+  '''!
+  @brief  Binary mask stored as row-wise packed bits.
+
+  Holds the output of ``np.packbits(I, axis=1)`` along with the mask width,
+  which the packing loses.  Row counts and column moments come from
+  popcount lookup tables applied to the packed bytes, a band of rows at a
+  time, so the mask never gets unpacked as a whole.  Pad bits at the end
+  of each row must be zero (as ``np.packbits`` produces).
+  '''
+
+  #============================ PackedMask ===========================
+  #
+  # @brief  Constructor.
+  #
+  # @param[in]  bits    Packed mask (H x ceil(W/8)), uint8.
+  # @param[in]  width   Mask width W in pixels.
+  # @param[in]  nBand   Number of rows looked up at a time.
+  #
+  def __init__(self, bits, width, nBand = 256):
+
+    self.bits  = np.asarray(bits, dtype=np.uint8)
+    self.shape = (self.bits.shape[0], int(width))
+    self.nBand = nBand
+
+  #============================= fromMask ============================
+  #
+  # @brief  Pack a dense mask (nonzero pixels are foreground).
+  #
+  @staticmethod
+  def fromMask(I):
+
+    return PackedMask(np.packbits(np.asarray(I) != 0, axis=1), np.shape(I)[1])
+
+  #============================== unpack =============================
+  #
+  # @brief  Unpack a range of rows to a dense boolean mask.
+  #
+  # @param[in]  r0  First row (default: 0).
+  # @param[in]  r1  One past the last row (default: H).
+  #
+  def unpack(self, r0 = 0, r1 = None):
+
+    Ib = np.unpackbits(self.bits[r0:r1], axis=1, count=self.shape[1])
+    return Ib.view(bool)
+
+  #============================= rowCounts ===========================
+  #
+  # @brief  Number of foreground pixels in each row.
+  #
+  def rowCounts(self):
+
+    rowCount = np.empty(self.shape[0], dtype=np.int64)
+    for r0 in range(0, self.shape[0], self.nBand):
+      rowCount[r0:r0+self.nBand] = np.sum(_POPCOUNT[self.bits[r0:r0+self.nBand]],
+                                          axis=1, dtype=np.int64)
+    return rowCount
+
+  #============================ colMoments ===========================
+  #
+  # @brief  Count and column coordinate sum of a row range's pixels.
+  #
+  # @param[in]  r0    First row (default: 0).
+  # @param[in]  r1    One past the last row (default: H).
+  #
+  # @param[out] m00   Pixel count.
+  # @param[out] m10   Sum of column (x) coordinates.
+  #
+  def colMoments(self, r0 = 0, r1 = None):
+
+    r1   = self.shape[0] if r1 is None else min(r1, self.shape[0])
+    bcol = 8 * np.arange(self.bits.shape[1], dtype=np.int64)
+
+    m00 = 0
+    m10 = 0
+    for b0 in range(r0, r1, self.nBand):
+      Ib   = self.bits[b0:min(b0+self.nBand, r1)]
+      bpop = np.sum(_POPCOUNT[Ib], axis=0, dtype=np.int64)
+      m00 += int(np.sum(bpop))
+      m10 += int(bpop @ bcol) + int(np.sum(_BITPOSN[Ib], dtype=np.int64))
+
+    return m00, m10
+
+  #============================= moments =============================
+  #
+  # @brief  Zeroth and first order moments of the foreground pixels.
+  #
+  # @param[out] m00   Pixel count.
+  # @param[out] m10   Sum of column (x) coordinates.
+  # @param[out] m01   Sum of row (y) coordinates.
+  #
+  def moments(self):
+
+    m00, m10 = self.colMoments()
+    m01 = int(self.rowCounts() @ np.arange(self.shape[0]))
+
+    return m00, m10, m01
+
+  #============================ rowNonzero ===========================
+  #
+  # @brief  Column indices of the foreground pixels of a row.
+  #
+  def rowNonzero(self, r):
+
+    return np.flatnonzero(np.unpackbits(self.bits[r], count=self.shape[1]))
+
+
+#
+#---------------------------------------------------------------------------
+#================================= RunMask =================================
+#---------------------------------------------------------------------------
+#
+
+class RunMask(CompactMask):
+  '''!
+  @brief  Sparse binary mask stored as horizontal runs of foreground pixels.
+
+  Each run is a row index, a start column, and a length.  The runs are
+  kept sorted in raster order, with overlapping or abutting runs of a row
+  merged, so the run order is the raster order of their first pixels.
+  Moments, row counts and connected components are all computed from the
+  runs directly.
+  '''
+
+  #============================= RunMask =============================
+  #
+  # @brief  Constructor from run-length encoded rows.
+  #
+  # @param[in]  rows      Row index of each run.
+  # @param[in]  starts    First column of each run.
+  # @param[in]  lengths   Number of pixels of each run.
+  # @param[in]  shape     Mask size (H, W).
+  #
+  def __init__(self, rows, starts, lengths, shape):
+
+    rows    = np.asarray(rows, dtype=np.int64).ravel()
+    starts  = np.asarray(starts, dtype=np.int64).ravel()
+    ends    = starts + np.asarray(lengths, dtype=np.int64).ravel()
+
+    self.shape = (int(shape[0]), int(shape[1]))
+
+    isRun = ends > starts
+    rows, starts, ends = rows[isRun], starts[isRun], ends[isRun]
+
+    order = np.lexsort((starts, rows))
+    rows, starts, ends = rows[order], starts[order], ends[order]
+
+    # Merge runs that overlap or abut within a row.  Keys are spaced so
+    # that runs of different rows never compare as overlapping.
+    rowKey = rows * (self.shape[1] + 1)
+    endMax = np.maximum.accumulate(rowKey + ends)
+    isNew  = np.ones(rows.size, dtype=bool)
+    isNew[1:] = (rowKey[1:] + starts[1:]) > endMax[:-1]
+
+    iNew = np.flatnonzero(isNew)
+    self.rows   = rows[iNew]
+    self.starts = starts[iNew]
+    self.ends   = np.maximum.reduceat(ends, iNew) if iNew.size else ends
+
+  #============================= fromCoords ==========================
+  #
+  # @brief  Build from a list of foreground pixel coordinates.
+  #
+  # @param[in]  pts     Pixel coordinates, 2 x K array of (x,y) values.
+  # @param[in]  shape   Mask size (H, W).
+  #
+  @staticmethod
+  def fromCoords(pts, shape):
+
+    lind = np.unique(np.ravel_multi_index((pts[1], pts[0]), shape))
+    isNew = np.ones(lind.size, dtype=bool)
+    isNew[1:] = (np.diff(lind) != 1) | ((lind[1:] % shape[1]) == 0)
+
+    iNew = np.flatnonzero(isNew)
+    lens = np.diff(np.append(iNew, lind.size))
+    rows, starts = np.divmod(lind[iNew], shape[1])
+
+    return RunMask(rows, starts, lens, shape)
+
+  #============================= fromMask ============================
+  #
+  # @brief  Build from a dense mask (nonzero pixels are foreground).
+  #
+  @staticmethod
+  def fromMask(I):
+
+    Ib = np.asarray(I) != 0
+    Id = np.diff(Ib.astype(np.int8), axis=1, prepend=0, append=0)
+
+    rows, starts = np.nonzero(Id == 1)
+    _, ends = np.nonzero(Id == -1)
+
+    return RunMask(rows, starts, ends - starts, Ib.shape)
+
+  #============================== unpack =============================
+  #
+  # @brief  Rasterize a range of rows to a dense boolean mask.
+  #
+  def unpack(self, r0 = 0, r1 = None):
+
+    r1 = self.shape[0] if r1 is None else min(r1, self.shape[0])
+    Ib = np.zeros((r1 - r0, self.shape[1] + 1), dtype=np.int8)
+
+    inRange = (self.rows >= r0) & (self.rows < r1)
+    np.add.at(Ib, (self.rows[inRange] - r0, self.starts[inRange]), 1)
+    np.add.at(Ib, (self.rows[inRange] - r0, self.ends[inRange]), -1)
+
+    return np.cumsum(Ib, axis=1)[:,:-1] > 0
+
+  #============================= rowCounts ===========================
+  #
+  # @brief  Number of foreground pixels in each row.
+  #
+  def rowCounts(self):
+
+    return np.bincount(self.rows, weights=self.ends - self.starts,
+                       minlength=self.shape[0]).astype(np.int64)
+
+  #============================ colMoments ===========================
+  #
+  # @brief  Count and column coordinate sum of a row range's pixels.
+  #
+  # Sums of the runs' lengths and of their arithmetic series of columns.
+  #
+  def colMoments(self, r0 = 0, r1 = None):
+
+    i0 = np.searchsorted(self.rows, r0, side='left')
+    i1 = self.rows.size if r1 is None else np.searchsorted(self.rows, r1, side='left')
+
+    lens = self.ends[i0:i1] - self.starts[i0:i1]
+    m00  = int(np.sum(lens))
+    m10  = int(np.sum(lens * (self.starts[i0:i1] + self.ends[i0:i1] - 1) // 2))
+
+    return m00, m10
+
+  #============================= moments =============================
+  #
+  # @brief  Zeroth and first order moments of the foreground pixels.
+  #
+  def moments(self):
+
+    m00, m10 = self.colMoments()
+    m01 = int(np.sum(self.rows * (self.ends - self.starts)))
+
+    return m00, m10, m01
+
+  #============================ rowNonzero ===========================
+  #
+  # @brief  Column indices of the foreground pixels of a row.
+  #
+  def rowNonzero(self, r):
+
+    i0 = np.searchsorted(self.rows, r, side='left')
+    i1 = np.searchsorted(self.rows, r, side='right')
+
+    return np.concatenate([np.arange(s, e) for s, e in
+                           zip(self.starts[i0:i1], self.ends[i0:i1])] + [np.zeros(0, int)])
+
+  #============================== label ==============================
+  #
+  # @brief  Connected components of the runs.
+  #
+  # Runs of adjacent rows are connected when they overlap (connectivity 1)
+  # or overlap/touch diagonally (connectivity 2), as per the scikit-image
+  # ``label`` convention.  Components are numbered in raster order of
+  # their first pixel, as ``label`` does.
+  #
+  # @param[in]  conn    Connectivity (1 or 2).
+  #
+  # @param[out] runLab  Component index (from 0) of each run.
+  # @param[out] nComp   Number of components.
+  #
+  def label(self, conn = 1):
+
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    nRuns = self.rows.size
+    if (nRuns == 0):
+      return np.zeros(0, dtype=np.int64), 0
+
+    #--[1] Runs of the previous row overlapping each run form the interval
+    #      [lo, hi) of the run list.  Keys are spaced by more than the
+    #      width so that comparisons never cross rows.
+    dc   = 1 if (conn == 2) else 0
+    kGap = self.shape[1] + 2
+    kPrv = (self.rows - 1) * kGap
+
+    lo = np.searchsorted(self.rows * kGap + self.ends, kPrv + self.starts - dc, side='right')
+    hi = np.searchsorted(self.rows * kGap + self.starts, kPrv + self.ends + dc, side='left')
+
+    #--[2] Expand the intervals to run pairs and find the components.
+    nHit = np.maximum(hi - lo, 0)
+    iSrc = np.repeat(np.arange(nRuns), nHit)
+    iDst = np.repeat(lo - np.cumsum(nHit) + nHit, nHit) + np.arange(iSrc.size)
+
+    adj = coo_matrix((np.ones(iSrc.size, dtype=bool), (iSrc, iDst)), shape=(nRuns, nRuns))
+    nComp, runLab = connected_components(adj, directed=False)
+
+    #--[3] Renumber by first run, which is raster order.
+    _, iFirst = np.unique(runLab, return_index=True)
+    relab = np.empty(nComp, dtype=np.int64)
+    relab[np.argsort(iFirst)] = np.arange(nComp)
+
+    return relab[runLab], nComp
+
+  #============================= regions =============================
+  #
+  # @brief  Area and centroid of each connected component.
+  #
+  # @param[in]  conn    Connectivity (1 or 2).
+  #
+  # @param[out] area    Pixel count of each component.
+  # @param[out] cpt     Centroids (2 x N) in OpenCV (x,y) order.
+  #
+  def regions(self, conn = 1):
+
+    runLab, nComp = self.label(conn)
+
+    lens = self.ends - self.starts
+    area = np.bincount(runLab, weights=lens, minlength=nComp)
+    m10  = np.bincount(runLab, weights=lens * (self.starts + self.ends - 1) // 2,
+                       minlength=nComp)
+    m01  = np.bincount(runLab, weights=lens * self.rows, minlength=nComp)
+
+    return area.astype(np.int64), np.vstack((m10 / area, m01 / area))
+
+#
+#================================= masks =================================
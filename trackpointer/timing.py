@@ -0,0 +1,127 @@
+#================================= timing ================================
+#
+# @brief    Lightweight per-stage timing of trackpointer processing.
+#
+# A StageTimer collects the durations of the named processing stages of a
+# tracker (improcessor, labeling, centroid computation, etc.) in fixed
+# size rolling windows, from which percentile summaries are computed on
+# demand.  Trackers hold no timer by default, in which case the timing
+# hooks reduce to a single ``None`` test per stage.
+#
+#================================= timing ================================
+
+#
+# @file     timing.py
+#
+# @date     2026/10/17  [created]
+#
+#!NOTE:
+#!  set indent to 2 spaces.
+#!  do not indent function code.
+#!  set tab to 4 spaces with conversion to spaces.
+#
+#================================= timing ================================
+
+import time
+
+import numpy as np
+
+
+#
+#---------------------------------------------------------------------------
+#=============================== StageTimer ================================
+#---------------------------------------------------------------------------
+#
+
+class StageTimer(object):
+  '''!
+  @brief  Rolling window recorder of per-stage durations.
+
+  Usage within a tracker::
+
+    t0 = timer.now()
+    ...                                   # Stage work.
+    t0 = timer.toc('label', t0)           # Record, get new start time.
+
+  Durations are in seconds, as measured by the timer's clock.  Capture
+  timestamps given to a tracker should use the same clock.
+  '''
+
+  #============================ StageTimer ===========================
+  #
+  # @brief  Constructor.
+  #
+  # @param[in]  window  Number of most recent durations kept per stage.
+  # @param[in]  clock   Clock function (default: time.perf_counter).
+  #
+  def __init__(self, window = 1024, clock = time.perf_counter):
+
+    self.window = int(window)
+    self.now    = clock
+    self.reset()
+
+  #============================== reset ==============================
+  #
+  # @brief  Clear all recorded durations.
+  #
+  def reset(self):
+
+    self.durs   = dict()
+    self.counts = dict()
+
+  #=============================== toc ===============================
+  #
+  # @brief  Record the duration of a stage that started at tStart.
+  #
+  # @param[out] tNow    The current time, to start the next stage with.
+  #
+  def toc(self, stage, tStart):
+
+    tNow = self.now()
+    self.record(stage, tNow - tStart)
+    return tNow
+
+  #============================== record =============================
+  #
+  # @brief  Record a stage duration.
+  #
+  def record(self, stage, dur):
+
+    if stage not in self.durs:
+      self.durs[stage]   = np.zeros(self.window)
+      self.counts[stage] = 0
+
+    self.durs[stage][self.counts[stage] % self.window] = dur
+    self.counts[stage] += 1
+
+  #=============================== last ==============================
+  #
+  # @brief  Most recent duration of each stage.
+  #
+  def last(self):
+
+    return {stage: self.durs[stage][(self.counts[stage] - 1) % self.window]
+            for stage in self.durs}
+
+  #============================= summary =============================
+  #
+  # @brief  Percentile summary of each stage over the rolling window.
+  #
+  # @param[in]  pcts    Percentiles to report.
+  #
+  # @param[out] summ    Dictionary of stage -> dictionary with the total
+  #                     count, window mean, and 'p<N>' percentiles.
+  #
+  def summary(self, pcts = (50, 90, 99)):
+
+    summ = dict()
+    for stage, durs in self.durs.items():
+      vals = durs[:min(self.counts[stage], self.window)]
+      summ[stage] = dict(count = self.counts[stage], mean = float(np.mean(vals)))
+      for pct, val in zip(pcts, np.percentile(vals, pcts)):
+        summ[stage]['p' + str(pct)] = float(val)
+
+    return summ
+
+#
+#================================= timing ================================
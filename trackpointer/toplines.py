@@ -25,10 +25,10 @@
 #================================ toplines ===============================
 
 import numpy as np
-import matplotlib.pyplot as plt
 from dataclasses import dataclass
 
 import trackpointer.centroid as tp
+from trackpointer.masks import CompactMask
 
 @dataclass
 class Params(object):
@@ -57,42 +57,35 @@ class fromTop(tp.centroid):
     if not isinstance(params, Params):
       params = self.setIfMissing(params,'plotStyle','rx')
 
-    self.tparams = params
-    self.haveMeas = False
-
-    if iPt:
-      self.tpt = iPt
-      self.haveMeas = True
-    else:
-      self.tpt = None
+    super().__init__(iPt, params)
 
   #============================== measure ==============================
   #
   # @brief  Measure the track point from the given image.
   #
   # @param[in]  I         The input image.
+  # @param[in]  tstate    Optional state to fill in place.
   #
   # @param[out] mstate    The measured state.
   #
-  def measure(self, I):
+  def measure(self, I, tstate = None):
 
+    Ip = self.preprocess(I)
 
-    if hasattr(self.tparams, 'improcessor') and self.tparams.improcessor:
-      Ip = self.tparams.improcessor.apply(I)
-    else:
-      Ip = I
+    timer = self.timer
+    if timer is not None:
+      t0 = timer.now()
 
     #--[1] Get the top-most non-empty row and ones before it. Compute row
     #      average of data.
     #      
-    imsize   = np.shape(Ip)
-    hitCount = np.sum(Ip, axis=1)
+    imsize   = Ip.shape
+    hitCount = rowSums(Ip)
     hitInds  = np.argwhere(hitCount)
 
     if (np.size(hitInds) == 0):     # If nothing, then no measurement.
 
-      self.tpt = None
-      self.haveMeas = False
+      self.setPoint(None, None)
 
     else:
 
@@ -109,15 +102,34 @@ class fromTop(tp.centroid):
 
       #--[2] Get the row and ones before it. Compute column average.
       #      
-      Irows = Ip[topInd:botInd,:]
-      ibin, jbin = np.nonzero(Irows)          # y,x in OpenCV
+      ccol = bandColMean(Ip, topInd, botInd)
+
+      self.setPoint(ccol, crow, tstate)
 
-      self.tpt = np.array([np.mean(jbin), crow]).reshape(-1,1)
-      self.haveMeas = True
+    if timer is not None:
+      timer.toc('toplines', t0)
 
-    mstate = self.getState()
+    mstate = self.getState(tstate)
     return mstate
 
+  #============================ _measureStack ==========================
+  #
+  # @brief  Vectorized fromTop measurement over a (preprocessed) stack.
+  #
+  def _measureStack(self, Ip):
+
+    hitCount = _hitCounts(Ip)
+    hasHit   = hitCount != 0
+    haveMeas = np.any(hasHit, axis=1)
+
+    topInd = np.argmax(hasHit, axis=1)
+    botInd = np.minimum(topInd + self.tparams.numLines, Ip.shape[1])
+
+    tpts = _bandPoints(Ip, hitCount, topInd, botInd, self.tparams.numLines)
+    tpts[~haveMeas,:] = np.nan
+
+    return tpts, haveMeas
+
 class fromBottom(tp.centroid):
 
   #============================== fromTop ==============================
@@ -132,42 +144,35 @@ class fromBottom(tp.centroid):
     if not isinstance(params, Params):
       params = self.setIfMissing(params,'plotStyle','rx')
 
-    self.tparams = params
-    self.haveMeas = False
-
-    if iPt:
-      self.tpt = iPt
-      self.haveMeas = True
-    else:
-      self.tpt = None
+    super().__init__(iPt, params)
 
   #============================== measure ==============================
   #
   # @brief  Measure the track point from the given image.
   #
   # @param[in]  I         The input image.
+  # @param[in]  tstate    Optional state to fill in place.
   #
   # @param[out] mstate    The measured state.
   #
-  def measure(self, I):
+  def measure(self, I, tstate = None):
 
+    Ip = self.preprocess(I)
 
-    if hasattr(self.tparams, 'improcessor') and self.tparams.improcessor:
-      Ip = self.tparams.improcessor.apply(I)
-    else:
-      Ip = I
+    timer = self.timer
+    if timer is not None:
+      t0 = timer.now()
 
     #--[1] Get the bottom-most non-empty row and ones before it. Compute row
     #      average of data.
     #      
-    imsize   = np.shape(Ip)
-    hitCount = np.sum(Ip, axis=1)
+    imsize   = Ip.shape
+    hitCount = rowSums(Ip)
     hitInds  = np.argwhere(hitCount)
 
     if (np.size(hitInds) == 0):     # If nothing, then no measurement.
 
-      self.tpt = None
-      self.haveMeas = False
+      self.setPoint(None, None)
 
     else:
 
@@ -183,22 +188,116 @@ class fromBottom(tp.centroid):
 
       #--[2] Get the row and ones before it. Compute column average.
       #      
-      Irows = Ip[topInd:botInd,:]
-      ibin, jbin = np.nonzero(Irows)          # y,x in OpenCV
+      ccol = bandColMean(Ip, topInd, botInd)
 
-      self.tpt = np.array([np.mean(jbin), crow]).reshape(-1,1)
-      self.haveMeas = True
+      self.setPoint(ccol, crow, tstate)
 
-    mstate = self.getState()
+    if timer is not None:
+      timer.toc('toplines', t0)
+
+    mstate = self.getState(tstate)
     return mstate
 
+  #============================ _measureStack ==========================
+  #
+  # @brief  Vectorized fromBottom measurement over a (preprocessed) stack.
+  #
+  def _measureStack(self, Ip):
+
+    hitCount = _hitCounts(Ip)
+    hasHit   = hitCount != 0
+    haveMeas = np.any(hasHit, axis=1)
+
+    botInd = Ip.shape[1] - np.argmax(hasHit[:,::-1], axis=1)
+    topInd = np.maximum(botInd - self.tparams.numLines, 0)
+
+    tpts = _bandPoints(Ip, hitCount, topInd, botInd, self.tparams.numLines)
+    tpts[~haveMeas,:] = np.nan
+
+    return tpts, haveMeas
+
+
+#============================== _hitCounts =============================
+#
+# @brief  Row-wise sums of a stack, as the per-frame ``np.sum(Ip, axis=1)``.
+#
+def _hitCounts(Ip):
+
+  hitCount = np.sum(Ip, axis=2)
+  if (hitCount.dtype.kind in 'biu'):
+    hitCount = hitCount.astype(np.int64)
+
+  return hitCount
+
+#============================== _bandPoints ============================
+#
+# @brief  Track points from the row band [topInd, botInd) of each frame.
+#
+# Row coordinate is the hit count weighted row average, column coordinate
+# is the average column of the nonzero pixels in the band.  Only the band
+# rows (at most numLines of them) are gathered from the stack.
+#
+# @param[in]  Ip        Preprocessed image stack (N x H x W).
+# @param[in]  hitCount  Row-wise sums of the stack (N x H).
+# @param[in]  topInd    First band row per frame (N).
+# @param[in]  botInd    One past the last band row per frame (N).
+# @param[in]  numLines  Maximum band height.
+#
+# @param[out] tpts      Track points (N x 2) in OpenCV (x,y) order.
+#
+def _bandPoints(Ip, hitCount, topInd, botInd, numLines):
+
+  rowInds = topInd[:,None] + np.arange(numLines)
+  inBand  = rowInds < botInd[:,None]
+  rowInds = np.minimum(rowInds, Ip.shape[1]-1)
+
+  useCount = np.where(inBand, np.take_along_axis(hitCount, rowInds, axis=1), 0)
+
+  Irows = Ip[np.arange(Ip.shape[0])[:,None], rowInds] != 0
+  Irows &= inBand[:,:,None]
+  colCount = np.sum(Irows, axis=1, dtype=np.int64)
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    crow = np.sum(useCount * rowInds, axis=1) / np.sum(useCount, axis=1)
+    ccol = (colCount @ np.arange(Ip.shape[2])) / np.sum(colCount, axis=1)
+
+  return np.stack((ccol, crow), axis=1)
+
 
+#=============================== rowSums ===============================
+#
+# @brief  Row-wise sums of the image, or row pixel counts of a compact mask.
+#
+def rowSums(Ip):
+
+  if isinstance(Ip, CompactMask):
+    return Ip.rowCounts()
+  else:
+    return np.sum(Ip, axis=1)
 
+#============================= bandColMean =============================
+#
+# @brief  Average column of the nonzero pixels in rows [topInd, botInd).
+#
+def bandColMean(Ip, topInd, botInd):
+
+  if isinstance(Ip, CompactMask):
+    m00, m10 = Ip.colMoments(topInd, botInd)
+    return m10 / m00
+  else:
+    Irows = Ip[topInd:botInd,:]
+    ibin, jbin = np.nonzero(Irows)          # y,x in OpenCV
+    return np.mean(jbin)
+
+#============================= tipFromBottom ===========================
+#
+# @brief  Bottom-most point of a binary mask (dense or compact).
+#
 def tipFromBottom(Ib):
 
   #--[1] Compute row-wise sum of binary mask.
-  imsize   = np.shape(Ib)
-  hitCount = np.sum(Ib, axis=1)
+  imsize   = Ib.shape
+  hitCount = rowSums(Ib)
   hitInds  = np.argwhere(hitCount)
 
   if (np.size(hitInds) == 0):     # If nothing, then no measurement.
@@ -213,8 +312,11 @@ def tipFromBottom(Ib):
 
     #--[3] Get the column median for the bottom row.
     #
-    Irow = Ib[botInd,:]
-    jind = np.flatnonzero(Irow)          # x in OpenCV
+    if isinstance(Ib, CompactMask):
+      jind = Ib.rowNonzero(botInd)
+    else:
+      Irow = Ib[botInd,:]
+      jind = np.flatnonzero(Irow)        # x in OpenCV
 
     medi = int(np.size(jind)/2)
 
@@ -223,5 +325,42 @@ def tipFromBottom(Ib):
 
     return tp
 
+#=========================== tipFromBottomBatch ==========================
+#
+# @brief  Vectorized ``tipFromBottom`` over a stack of binary masks.
+#
+# @param[in]  Ibs       Mask stack (N x H x W), array or memmap.
+# @param[in]  nChunk    Number of frames to reduce at a time.
+#
+# @param[out] tpts      Tip points (N x 2) in OpenCV (x,y) order.
+#                       Frames without a measurement are NaN.
+# @param[out] haveMeas  Measurement flags (N).
+#
+def tipFromBottomBatch(Ibs, nChunk = 32):
+
+  nFrames  = np.shape(Ibs)[0]
+  tpts     = np.full((nFrames, 2), np.nan)
+  haveMeas = np.zeros(nFrames, dtype=bool)
+
+  for n0 in range(0, nFrames, nChunk):
+    n1 = min(n0 + nChunk, nFrames)
+    Ib = np.asarray(Ibs[n0:n1])
+
+    #--[1] Bottom-most non-empty row of each frame.
+    hasHit = _hitCounts(Ib) != 0
+    isMeas = np.any(hasHit, axis=1)
+    botInd = Ib.shape[1] - 1 - np.argmax(hasHit[:,::-1], axis=1)
+
+    #--[2] Column median of the bottom row, as the (k//2)-th nonzero.
+    Irow = Ib[np.arange(n1-n0), botInd] != 0
+    medi = np.sum(Irow, axis=1) // 2
+    jind = np.argmax(np.cumsum(Irow, axis=1) > medi[:,None], axis=1)
+
+    tpts[n0:n1,0] = np.where(isMeas, jind, np.nan)
+    tpts[n0:n1,1] = np.where(isMeas, botInd, np.nan)
+    haveMeas[n0:n1] = isMeas
+
+  return tpts, haveMeas
+
 #
 #================================ toplines ===============================
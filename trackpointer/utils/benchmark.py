@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+#=============================== benchmark ===============================
+#
+# @brief    Self-contained timing benchmark of the trackpointers.
+#
+# Synthesizes binary mask sequences with fakeTriangle (a rigid set of
+# square markers rotating about the image center), then times the
+# trackpointers on them: throughput, per-frame latency percentiles and
+# peak (traced) memory.  Results are written as JSON so that runs can be
+# compared, e.g., before and after a change or across machines.
+#
+# Usage::
+#
+#   python -m trackpointer.utils.benchmark --out run.json
+#   python -m trackpointer.utils.benchmark --sizes vga,4k --blobs 1,20 \
+#                                          --compare base.json
+#
+#=============================== benchmark ===============================
+
+#
+# @file     benchmark.py
+#
+# @date     2026/10/17  [created]
+#
+#!NOTE:
+#!  set indent to 2 spaces.
+#!  do not indent function code.
+#!  set tab to 4 spaces with conversion to spaces.
+#
+#=============================== benchmark ===============================
+
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+import Lie.group.SE2.Homog
+from trackpointer.utils.fakeTriangle import fakeTriangle
+import trackpointer.centroid as centroid
+import trackpointer.centroidMulti as centroidMulti
+import trackpointer.toplines as toplines
+
+
+## Named image sizes (rows, cols).
+SIZES = dict(vga = (480, 640), hd = (720, 1280), fhd = (1080, 1920),
+             uhd = (2160, 3840))
+SIZES['4k'] = SIZES['uhd']
+
+## Benchmarked trackers, as name -> factory of a per-frame callable.
+TRACKERS = dict(
+  centroid      = lambda: centroid.centroid().process,
+  fromTop       = lambda: toplines.fromTop().process,
+  fromBottom    = lambda: toplines.fromBottom().process,
+  tipFromBottom = lambda: toplines.tipFromBottom,
+  centroidMulti = lambda: centroidMulti.centroidMulti().process
+  )
+
+
+#============================== makeSequence =============================
+#
+# @brief  Synthesize a binary mask sequence with fakeTriangle.
+#
+# The markers are squares placed at random within a disc about the image
+# center, and move rigidly by rotating about the center.
+#
+# @param[in]  imSize    Image size (rows, cols).
+# @param[in]  nBlobs    Number of markers (blobs).
+# @param[in]  blobSize  Marker side length, in pixels.
+# @param[in]  nFrames   Number of frames.
+# @param[in]  seed      Random seed of the marker placement.
+#
+# @param[out] Is        List of boolean masks.
+#
+def makeSequence(imSize, nBlobs = 1, blobSize = 16, nFrames = 30, seed = 0):
+
+  rng    = np.random.default_rng(seed)
+  radius = 0.35 * min(imSize)
+
+  rads  = radius * np.sqrt(rng.random(nBlobs))
+  angs  = 2 * np.pi * rng.random(nBlobs)
+  pMark = np.vstack((rads * np.cos(angs), rads * np.sin(angs), np.ones(nBlobs)))
+
+  hSide = blobSize / 2
+  sMark = np.array([[-hSide, -hSide, hSide, hSide],
+                    [-hSide, hSide, hSide, -hSide],
+                    [0, 0, 0, 0]])
+  sMark = np.repeat(sMark[np.newaxis], nBlobs, axis=0)
+
+  ftarg = fakeTriangle(pMark, sMark, np.array(imSize))
+
+  x  = np.array([[imSize[0] / 2], [imSize[1] / 2]])
+  g  = Lie.group.SE2.Homog(R = Lie.group.SE2.Homog.rotationMatrix(0), x = x)
+  dg = Lie.group.SE2.Homog(x = np.zeros((2,1)),
+                           R = Lie.group.SE2.Homog.rotationMatrix(np.pi/50))
+
+  Is = []
+  for ii in range(nFrames):
+    ftarg.setPose(g)
+    Is.append(ftarg.render().astype(bool))
+    g = g * dg
+
+  return Is
+
+#================================ timeRun ================================
+#
+# @brief  Time a per-frame callable over a sequence.
+#
+# @param[in]  func      Per-frame callable (tracker process, etc.).
+# @param[in]  Is        The frame sequence.
+# @param[in]  nWarmup   Number of untimed warm-up frames.
+#
+# @param[out] stats     Dictionary of the throughput (frames/s), latency
+#                       mean and percentiles (ms), and peak memory (bytes).
+#
+def timeRun(func, Is, nWarmup = 3):
+
+  for I in Is[:nWarmup]:
+    func(I)
+
+  lats = np.zeros(len(Is))
+  tBeg = time.perf_counter()
+  for ii, I in enumerate(Is):
+    t0 = time.perf_counter()
+    func(I)
+    lats[ii] = time.perf_counter() - t0
+  tAll = time.perf_counter() - tBeg
+
+  # Memory is traced on a separate pass, since tracing slows allocations.
+  tracemalloc.start()
+  for I in Is[:max(nWarmup, 1)]:
+    func(I)
+  peakMem = tracemalloc.get_traced_memory()[1]
+  tracemalloc.stop()
+
+  lats *= 1e3
+  return dict(fps = len(Is) / tAll, mean = float(np.mean(lats)),
+              p50 = float(np.percentile(lats, 50)),
+              p90 = float(np.percentile(lats, 90)),
+              p99 = float(np.percentile(lats, 99)),
+              peakMem = int(peakMem))
+
+#================================ runSuite ===============================
+#
+# @brief  Run the benchmark over all combinations of the settings.
+#
+# @param[in]  sizes     Image size names (see SIZES) or (rows, cols).
+# @param[in]  blobs     Blob counts.
+# @param[in]  blobSizes Blob sizes (side length, pixels).
+# @param[in]  trackers  Tracker names (see TRACKERS).
+# @param[in]  nFrames   Frames per sequence.
+# @param[in]  verbose   Print each result as it completes.
+#
+# @param[out] results   Dictionary with the run meta data and case list.
+#
+def runSuite(sizes = ('vga', 'hd', 'fhd', '4k'), blobs = (1, 5, 20),
+             blobSizes = (8, 32), trackers = tuple(TRACKERS), nFrames = 30,
+             verbose = False):
+
+  cases = []
+  for size in sizes:
+    imSize = SIZES[size] if isinstance(size, str) else tuple(size)
+    for nBlobs in blobs:
+      for blobSize in blobSizes:
+        Is = makeSequence(imSize, nBlobs, blobSize, nFrames)
+        for name in trackers:
+          stats = timeRun(TRACKERS[name](), Is)
+          case  = dict(tracker = name, imSize = list(imSize), nBlobs = nBlobs,
+                       blobSize = blobSize, nFrames = nFrames, **stats)
+          cases.append(case)
+          if verbose:
+            print(_caseLine(case))
+
+  meta = dict(time = time.strftime('%Y-%m-%dT%H:%M:%S'),
+              python = platform.python_version(), numpy = np.__version__,
+              machine = platform.machine(), node = platform.node())
+
+  return dict(meta = meta, cases = cases)
+
+#=============================== compareRuns =============================
+#
+# @brief  Throughput ratios of a run relative to a baseline run.
+#
+# Cases are matched on tracker, image size, blob count and blob size.
+#
+# @param[out] ratios    List of (case key, fps ratio) for the common cases.
+#
+def compareRuns(results, baseline):
+
+  def key(case):
+    return (case['tracker'], tuple(case['imSize']), case['nBlobs'],
+            case['blobSize'])
+
+  base = {key(case): case for case in baseline['cases']}
+
+  return [(key(case), case['fps'] / base[key(case)]['fps'])
+          for case in results['cases'] if key(case) in base]
+
+#================================ _caseLine ==============================
+#
+def _caseLine(case):
+
+  return '%-14s %4dx%-4d %3d x %3dpx  %8.1f fps  p50 %7.2f  p99 %7.2f ms  %6.1f MB' \
+         % (case['tracker'], case['imSize'][0], case['imSize'][1],
+            case['nBlobs'], case['blobSize'], case['fps'], case['p50'],
+            case['p99'], case['peakMem'] / 2**20)
+
+
+#
+#---------------------------------------------------------------------------
+#================================== Main ===================================
+#---------------------------------------------------------------------------
+#
+
+if __name__ == '__main__':
+
+  def csv(text, conv = str):
+    return [conv(item) for item in text.split(',')]
+
+  parser = argparse.ArgumentParser(description = 'Trackpointer benchmark.')
+  parser.add_argument('--out', default = 'benchmark.json',
+                      help = 'JSON output file.')
+  parser.add_argument('--sizes', default = 'vga,hd,fhd,4k', type = csv)
+  parser.add_argument('--blobs', default = '1,5,20',
+                      type = lambda text: csv(text, int))
+  parser.add_argument('--blob-size', default = '8,32',
+                      type = lambda text: csv(text, int))
+  parser.add_argument('--trackers', default = ','.join(TRACKERS), type = csv)
+  parser.add_argument('--frames', default = 30, type = int)
+  parser.add_argument('--compare', default = None,
+                      help = 'Baseline JSON file to report speedups against.')
+  args = parser.parse_args()
+
+  results = runSuite(args.sizes, args.blobs, args.blob_size, args.trackers,
+                     args.frames, verbose = True)
+
+  with open(args.out, 'w') as fid:
+    json.dump(results, fid, indent = 2)
+
+  if args.compare is not None:
+    with open(args.compare) as fid:
+      baseline = json.load(fid)
+    for key, ratio in compareRuns(results, baseline):
+      print('%-14s %4dx%-4d %3d x %3dpx  x%.2f' % (key[0], *key[1], *key[2:], ratio))
+
+#
+#=============================== benchmark ===============================
@@ -0,0 +1,255 @@
+#============================== displaySink ==============================
+#
+# @brief    Threaded, rate limited OpenCV display of images and track points.
+#
+# Drawing and showing each frame with OpenCV on the tracking thread (plus
+# the waitKey call) caps the tracking rate at the display rate.  A display
+# sink instead renders on its own thread.  The tracking thread posts the
+# latest image and track points into a single-slot mailbox, overwriting
+# whatever was not yet rendered, and never waits on the display.
+#
+#============================== displaySink ==============================
+
+#
+# @file     displaySink.py
+#
+# @date     2026/10/17  [created]
+#
+#!NOTE:
+#!  set indent to 2 spaces.
+#!  do not indent function code.
+#!  set tab to 4 spaces with conversion to spaces.
+#
+#============================== displaySink ==============================
+
+import threading
+import time
+
+import numpy as np
+
+
+#
+#---------------------------------------------------------------------------
+#=============================== displaySink ===============================
+#---------------------------------------------------------------------------
+#
+
+class displaySink(object):
+  '''!
+  @brief  Display of the latest image and track points, on its own thread.
+
+  Renders at most ``rate`` frames per second, at ``ratio`` times the image
+  resolution, with the track points scaled to match.  Since OpenCV windows
+  should be driven by one thread, the sink thread owns the window and the
+  key polling (see ``getKey``).
+
+  Usage::
+
+    dsink = displaySink(window_name="Tracking", ratio=0.5, rate=15)
+    dsink.start()
+    while ...:
+      tracker.process(I)
+      dsink.put(I, tracker.tpt if tracker.haveMeas else None)
+      if dsink.getKey() == ord('q'):
+        break
+    dsink.stop()
+  '''
+
+  #============================ displaySink ==========================
+  #
+  # @brief  Constructor.
+  #
+  # @param[in]  window_name The display window name.
+  # @param[in]  ratio       Display resolution scaling (None: no scaling).
+  # @param[in]  rate        Maximum render rate (frames per second).
+  # @param[in]  color       Track point marker color (BGR).
+  # @param[in]  markerSize  Track point marker size (display pixels).
+  #
+  def __init__(self, window_name = "track point ", ratio = None, rate = 15.0,
+                     color = (0, 0, 255), markerSize = 10):
+
+    self.window_name = window_name
+    self.ratio       = ratio
+    self.rate        = rate
+    self.color       = color
+    self.markerSize  = markerSize
+
+    self.slot     = None                # Mailbox: (image, track points).
+    self.slotLock = threading.Lock()
+    self.hasNew   = threading.Event()
+    self.isDone   = threading.Event()
+    self.thread   = None
+
+    self.key      = -1
+    self.nPut     = 0
+    self.nShown   = 0
+    self.nOverwritten = 0               # Frames replaced before rendering.
+
+  #=============================== start =============================
+  #
+  # @brief  Start the display thread.
+  #
+  def start(self):
+
+    self.isDone.clear()
+    self.thread = threading.Thread(target = self._run, daemon = True)
+    self.thread.start()
+
+  #=============================== stop ==============================
+  #
+  # @brief  Stop the display thread (and close the window).
+  #
+  def stop(self):
+
+    self.isDone.set()
+    self.hasNew.set()
+    if self.thread is not None:
+      self.thread.join()
+      self.thread = None
+
+  #================================ put ==============================
+  #
+  # @brief  Post an image and track points for display.  Never blocks.
+  #
+  # A previously posted frame that was not rendered yet is dropped.  The
+  # track points are copied, since trackers may update them in place.  The
+  # image is not, so it should not be modified after being posted.
+  #
+  # @param[in]  I       The image (grayscale, color or binary).
+  # @param[in]  tpt     Track points (2 x N, OpenCV x,y order), or None.
+  #
+  def put(self, I, tpt = None):
+
+    if tpt is not None:
+      tpt = np.array(tpt, dtype=float).reshape(2,-1)
+
+    with self.slotLock:
+      if self.slot is not None:
+        self.nOverwritten += 1
+      self.slot = (I, tpt)
+      self.nPut += 1
+
+    self.hasNew.set()
+
+  #============================== getKey =============================
+  #
+  # @brief  Last key pressed in the window since the previous call, or -1.
+  #
+  def getKey(self):
+
+    key, self.key = self.key, -1
+    return key
+
+  #============================== nDropped ===========================
+  #
+  # @brief  Number of posted frames overwritten by a newer one before the
+  #         display thread took them (a frame still waiting is not counted).
+  #
+  @property
+  def nDropped(self):
+
+    return self.nOverwritten
+
+  #============================== render =============================
+  #
+  # @brief  Render an image with its track points at the display ratio.
+  #
+  # @param[out] Ir      The rendered (BGR) image.
+  #
+  def render(self, I, tpt):
+
+    import cv2
+
+    if I.dtype == bool:
+      I = I.astype(np.uint8) * 255
+    elif I.dtype != np.uint8:
+      I = cv2.convertScaleAbs(I)
+
+    if self.ratio is not None and self.ratio != 1:
+      I = cv2.resize(I, None, fx = self.ratio, fy = self.ratio,
+                     interpolation = cv2.INTER_AREA if self.ratio < 1
+                                                    else cv2.INTER_NEAREST)
+
+    if I.ndim == 2:
+      Ir = cv2.cvtColor(I, cv2.COLOR_GRAY2BGR)
+    else:
+      Ir = np.ascontiguousarray(I)
+
+    if tpt is not None:
+      scale = 1 if self.ratio is None else self.ratio
+      for x, y in (scale * tpt).T:
+        if np.isfinite(x) and np.isfinite(y):
+          cv2.drawMarker(Ir, (int(round(x)), int(round(y))), self.color,
+                         cv2.MARKER_CROSS, self.markerSize, 2)
+
+    return Ir
+
+  #=============================== show ==============================
+  #
+  # @brief  Show a rendered image and poll the keyboard.
+  #
+  def show(self, Ir):
+
+    import cv2
+
+    cv2.imshow(self.window_name, Ir)
+    self.poll()
+
+  #=============================== poll ==============================
+  #
+  # @brief  Poll the keyboard (also keeps the window responsive).
+  #
+  def poll(self):
+
+    import cv2
+
+    key = cv2.waitKey(1)
+    if key != -1:
+      self.key = key
+
+  #=============================== _run ==============================
+  #
+  # @brief  Display thread: render the latest frame, at most at the rate.
+  #
+  def _run(self):
+
+    period = 0 if not self.rate else 1.0 / self.rate
+
+    try:
+      while not self.isDone.is_set():
+        if not self.hasNew.wait(0.1):
+          if self.nShown > 0:
+            self.poll()
+          continue
+        self.hasNew.clear()
+
+        with self.slotLock:
+          slot, self.slot = self.slot, None
+
+        if slot is None:
+          continue
+
+        tStart = time.perf_counter()
+        self.nShown += 1
+        self.show(self.render(*slot))
+
+        self.isDone.wait(max(0, period - (time.perf_counter() - tStart)))
+    finally:
+      if self.nShown > 0:
+        self.close()
+
+  #============================== close ==============================
+  #
+  # @brief  Close the display window.
+  #
+  def close(self):
+
+    import cv2
+
+    try:
+      cv2.destroyWindow(self.window_name)
+    except cv2.error:
+      pass
+
+#
+#============================== displaySink ==============================